@@ -24,6 +24,7 @@ from app.core.database import Base
 # Tanpa import ini, Base.metadata akan kosong (tidak tahu ada tabel user/wallet)
 from app.models.user import User
 from app.models.wallet import Wallet
+from app.models.transaction import Transaction, Category, DailySpending
 # --------------------------
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,49 @@
+"""add per-user hot query indexes
+
+Revision ID: c4e1a7d3b9f2
+Revises: 2139f6b75255
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e1a7d3b9f2'
+down_revision: Union[str, Sequence[str], None] = '2139f6b75255'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_transactions_user_date_active', 'transactions',
+        ['user_id', sa.text('date DESC'), sa.text('id DESC')],
+        unique=False,
+        postgresql_where=sa.text('deleted_at IS NULL'),
+    )
+    op.create_index(
+        'ix_transactions_user_type_date_active', 'transactions',
+        ['user_id', 'type', 'date'],
+        unique=False,
+        postgresql_where=sa.text('deleted_at IS NULL'),
+    )
+    op.create_index(
+        'ix_wallets_user_active', 'wallets',
+        ['user_id'],
+        unique=False,
+        postgresql_where=sa.text('deleted_at IS NULL'),
+    )
+    op.create_index('ix_categories_user_id', 'categories', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_categories_user_id', table_name='categories')
+    op.drop_index('ix_wallets_user_active', table_name='wallets')
+    op.drop_index('ix_transactions_user_type_date_active', table_name='transactions')
+    op.drop_index('ix_transactions_user_date_active', table_name='transactions')
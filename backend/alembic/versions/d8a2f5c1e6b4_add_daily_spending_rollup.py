@@ -0,0 +1,47 @@
+"""add daily spending rollup
+
+Revision ID: d8a2f5c1e6b4
+Revises: c4e1a7d3b9f2
+Create Date: 2026-10-18 13:40:21.503117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8a2f5c1e6b4'
+down_revision: Union[str, Sequence[str], None] = 'c4e1a7d3b9f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('daily_spending',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('type', postgresql.ENUM('INCOME', 'EXPENSE', 'TRANSFER', name='transactiontype', create_type=False), nullable=False),
+    sa.Column('total', sa.Numeric(precision=18, scale=2), nullable=False),
+    sa.Column('tx_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'day', 'category_id', 'type')
+    )
+
+    # Backfill dari transaksi yang sudah ada (bucket = tanggal UTC, sama dengan app/services/daily_spending.py)
+    op.execute("""
+        INSERT INTO daily_spending (user_id, day, category_id, type, total, tx_count)
+        SELECT user_id, (date AT TIME ZONE 'UTC')::date, COALESCE(category_id, 0), type, SUM(amount), COUNT(*)
+        FROM transactions
+        WHERE deleted_at IS NULL AND date IS NOT NULL
+        GROUP BY 1, 2, 3, 4
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('daily_spending')
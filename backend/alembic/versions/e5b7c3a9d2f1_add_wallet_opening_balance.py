@@ -0,0 +1,48 @@
+"""add wallet opening balance
+
+Revision ID: e5b7c3a9d2f1
+Revises: d8a2f5c1e6b4
+Create Date: 2026-10-18 15:02:47.281930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b7c3a9d2f1'
+down_revision: Union[str, Sequence[str], None] = 'd8a2f5c1e6b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('wallets', sa.Column('opening_balance', sa.Numeric(precision=15, scale=2), server_default='0', nullable=False))
+
+    # Saldo awal dompet lama = saldo sekarang - net semua transaksi aktif
+    # (anggap saldo saat migrasi benar; drift setelah ini yang dicek scripts.reconcile_wallets).
+    # Langkah 1 buat SEMUA wallet (termasuk yang belum punya transaksi), langkah 2 kurangi net transaksinya.
+    op.execute("UPDATE wallets SET opening_balance = COALESCE(balance, 0)")
+    op.execute("""
+        UPDATE wallets AS w
+        SET opening_balance = w.opening_balance - legs.net
+        FROM (
+            SELECT wallet_id, SUM(CASE WHEN type = 'INCOME' THEN amount ELSE -amount END) AS net
+            FROM (
+                SELECT wallet_id, type, amount FROM transactions WHERE deleted_at IS NULL
+                UNION ALL
+                SELECT target_wallet_id, 'INCOME', amount FROM transactions
+                WHERE deleted_at IS NULL AND type = 'TRANSFER' AND target_wallet_id IS NOT NULL
+            ) AS t
+            GROUP BY wallet_id
+        ) AS legs
+        WHERE legs.wallet_id = w.id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('wallets', 'opening_balance')
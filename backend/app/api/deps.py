@@ -1,10 +1,13 @@
+from dataclasses import dataclass
 from typing import Generator, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import make_transient_to_detached
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 from app.core.database import get_db
 from app.core.security import ALGORITHM
@@ -13,33 +16,81 @@ from app.models.user import User
 # Ini yang bikin Swagger UI muncul tombol "Authorize" (Gembok)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
-async def get_current_user(
-    db: AsyncSession = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
-) -> User:
+# Cache user per-proses, key = user id, value = snapshot kolom (dict), BUKAN object ORM
+# (object ORM terikat ke session request yang bikin, gak boleh di-share antar request).
+# Perubahan profil / password WAJIB panggil invalidate_user_cache() setelah commit.
+_user_cache = TTLCache(maxsize=settings.AUTH_CACHE_MAX_USERS, ttl=settings.AUTH_CACHE_TTL_SECONDS)
+
+@dataclass(frozen=True)
+class Principal:
     """
-    Validasi Token JWT dan ambil user yang sedang login.
+    Identitas user yang login, diambil LANGSUNG dari isi token (tanpa query DB).
+    Cukup buat endpoint yang cuma butuh `current_user.id`.
     """
-    credentials_exception = HTTPException(
+    id: int
+    email: str
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
+def _decode_token(token: str) -> Principal:
     try:
-        # 1. Decode Token
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+
+    email: Optional[str] = payload.get("sub")
+    user_id = payload.get("id")
+    if email is None or not isinstance(user_id, int):
+        raise _credentials_exception()
 
-    # 2. Ambil User dari DB berdasarkan email di token
-    result = await db.execute(select(User).where(User.email == email))
+    return Principal(id=user_id, email=email)
+
+def invalidate_user_cache(user_id: int) -> None:
+    """
+    Hook invalidasi: WAJIB dipanggil setelah commit perubahan profil user
+    (nama, email, avatar, password, hapus akun) supaya request berikutnya ambil data baru.
+    """
+    _user_cache.pop(user_id)
+
+async def get_current_principal(token: str = Depends(oauth2_scheme)) -> Principal:
+    """
+    Validasi Token JWT tanpa menyentuh DB.
+    """
+    return _decode_token(token)
+
+async def get_current_user(
+    db: AsyncSession = Depends(get_db),
+    token: str = Depends(oauth2_scheme)
+) -> User:
+    """
+    Validasi Token JWT dan ambil user yang sedang login.
+    Pakai cache (TTL + LRU) biar gak query tabel users di setiap request.
+    """
+    # 1. Decode Token
+    principal = _decode_token(token)
+
+    # 2. Cek cache dulu. Object dibangun ulang dari snapshot & ditempel ke session ini TANPA query
+    cached = _user_cache.get(principal.id)
+    if cached is not None:
+        # Sama dengan jalur DB: token lama (email sebelum diganti) gak boleh lolos lewat cache
+        if cached["email"] != principal.email:
+            raise _credentials_exception()
+        user = User(**cached)
+        make_transient_to_detached(user)
+        db.add(user)
+        return user
+
+    # 3. Ambil User dari DB berdasarkan id di token
+    result = await db.execute(select(User).where(User.id == principal.id))
     user = result.scalars().first()
-    
-    if user is None:
-        raise credentials_exception
-        
-    return user
\ No newline at end of file
+
+    if user is None or user.email != principal.email:
+        raise _credentials_exception()
+
+    _user_cache.set(user.id, {column.key: getattr(user, column.key) for column in User.__table__.columns})
+    return user
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -6,6 +7,67 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     DEBUG: bool = False
 
+    # Connection pool DB. Total koneksi maks per worker uvicorn = DB_POOL_SIZE + DB_MAX_OVERFLOW,
+    # jadi (pool_size + overflow) x jumlah worker harus < max_connections Postgres / pool PgBouncer.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30    # Detik nunggu koneksi kosong sebelum error
+    DB_POOL_RECYCLE: int = 1800    # Detik, koneksi lebih tua dari ini dibuka ulang (-1 = off)
+    DB_POOL_PRE_PING: bool = True  # Cek koneksi masih hidup tiap checkout (aman setelah DB restart)
+    DB_STATEMENT_CACHE_SIZE: int = 100 # Cache prepared statement asyncpg per koneksi
+    # PgBouncer mode transaction/statement: prepared statement gak bisa dipakai ulang antar transaksi,
+    # jadi cache statement dimatikan & nama statement dibuat unik
+    DB_PGBOUNCER: bool = False
+    # Endpoint diagnostik (/internal/*): off di production kecuali sengaja dibuka, otomatis aktif kalau DEBUG
+    INTERNAL_ENDPOINTS: bool = False
+    # /metrics Prometheus: aktif kalau DEBUG / INTERNAL_ENDPOINTS, atau kalau token ini diisi
+    # (scraper wajib kirim "Authorization: Bearer <token>")
+    METRICS_TOKEN: Optional[str] = None
+
+    # Query lambat di-log (tanpa nilai parameter), 0 = off
+    DB_SLOW_QUERY_MS: int = 500
+    # Deteksi N+1 per request (header X-DB-Queries + warning), otomatis aktif kalau DEBUG
+    DB_QUERY_INSPECT: bool = False
+    DB_N_PLUS_ONE_THRESHOLD: int = 5 # Statement yang sama berulang >= ini dalam 1 request
+
+    # Cache user yang login (skip query users di tiap request)
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAX_USERS: int = 10000
+
+    # Bcrypt: cost factor & jumlah thread khusus hashing (di luar event loop)
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+
+    # Cache hasil health check per user (di-invalidate saat wallet/transaksi berubah)
+    HEALTH_CACHE_TTL_SECONDS: int = 60
+    HEALTH_CACHE_MAX_USERS: int = 10000
+
+    # Cache kategori per user (dipakai list kategori & list transaksi, di-invalidate saat kategori berubah)
+    CATEGORY_CACHE_TTL_SECONDS: int = 300
+    CATEGORY_CACHE_MAX_USERS: int = 10000
+
+    # OCR Engine (process pool): jumlah worker, antrian maksimal, & timeout per job
+    OCR_WORKERS: int = 2
+    OCR_MAX_QUEUE: int = 8
+    OCR_JOB_TIMEOUT_SECONDS: float = 30
+
+    # OCR Job API (submit & poll): berapa lama hasil job disimpan & batas long-poll
+    OCR_JOB_RETENTION_SECONDS: int = 600
+    OCR_JOB_MAX_WAIT_SECONDS: int = 30
+
+    # Cache hasil OCR (key = hash isi gambar + config Tesseract)
+    OCR_CACHE_MAX_ITEMS: int = 1024
+    OCR_CACHE_TTL_SECONDS: int = 86400
+    OCR_CACHE_DIR: Optional[str] = None # Isi path folder buat aktifkan cache di disk
+    OCR_CACHE_DISK_MAX_MB: int = 256
+
+    # Batas upload gambar OCR: ukuran file & resolusi (dicek sebelum gambar di-decode)
+    OCR_MAX_UPLOAD_MB: int = 15
+    OCR_MAX_IMAGE_PIXELS: int = 50_000_000 # Foto HP 48 MP masih lolos
+
+    # Batch scan: maksimal file per request
+    OCR_BATCH_MAX_FILES: int = 30
+
     class Config:
         env_file = ".env"
 
@@ -1,9 +1,102 @@
+import time
+from uuid import uuid4
+
+from sqlalchemy import exc
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
+from app.core.metrics import instrument_engine
+from app.core.query_inspector import enable_query_inspector
+
+
+class PoolStats:
+    """Statistik checkout connection pool: berapa lama request nunggu koneksi & berapa yang timeout."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record(self, waited: float, timed_out: bool) -> None:
+        if timed_out:
+            self.timeouts += 1
+        else:
+            self.checkouts += 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+pool_stats = PoolStats()
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """QueuePool biasa + catat waktu tunggu tiap checkout (kelihatan kalau pool kekecilan)."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError: # Pool penuh lebih dari DB_POOL_TIMEOUT detik
+            timed_out = True
+            raise
+        finally:
+            pool_stats.record(time.perf_counter() - started, timed_out)
+
+
+def _connect_args() -> dict:
+    if not settings.DATABASE_URL.startswith("postgresql+asyncpg"):
+        return {}
+    if settings.DB_PGBOUNCER:
+        # Tiap transaksi bisa dapat koneksi server yang beda -> jangan cache / pakai ulang nama statement
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return {
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    }
+
 
 # Setup Engine
-engine = create_async_engine(settings.DATABASE_URL, echo=settings.DEBUG)
+engine = create_async_engine(
+    settings.DATABASE_URL,
+    echo=settings.DEBUG,
+    poolclass=TimedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args=_connect_args(),
+)
+instrument_engine(engine.sync_engine) # Jumlah & waktu SQL per request (lihat /metrics)
+enable_query_inspector(slow_query_ms=settings.DB_SLOW_QUERY_MS) # Log query lambat + deteksi N+1
+
+
+def pool_status() -> dict:
+    """Snapshot kondisi pool (per worker uvicorn) + statistik waktu tunggu checkout."""
+    pool = engine.pool
+    capacity = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    checked_out = pool.checkedout()
+    attempts = pool_stats.checkouts + pool_stats.timeouts
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checked_out": checked_out,
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "saturation": round(checked_out / capacity, 4) if capacity else 0.0,
+        "checkouts": pool_stats.checkouts,
+        "checkout_timeouts": pool_stats.timeouts,
+        "checkout_wait_avg_ms": round(pool_stats.wait_seconds_total / attempts * 1000, 3) if attempts else 0.0,
+        "checkout_wait_max_ms": round(pool_stats.wait_seconds_max * 1000, 3),
+    }
+
 
 # Setup Session Factory
 SessionLocal = sessionmaker(
@@ -20,4 +113,4 @@ async def get_db():
         try:
             yield session
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
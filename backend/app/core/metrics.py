@@ -0,0 +1,219 @@
+import bisect
+import time
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from sqlalchemy import event
+
+# Registry metrics in-memory, format output Prometheus text (tanpa dependency tambahan).
+# Per-proses: tiap worker uvicorn punya angka sendiri (scrape tiap worker / pakai 1 worker per pod).
+# Gak thread-safe, cukup karena semua update terjadi di thread event loop.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        for labels, value in self._values.items():
+            yield self.name, _format_labels(self.labelnames, labels), value
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: tuple = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+    def set(self, labels: tuple, value: float) -> None:
+        self._values[labels] = value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._values: dict[tuple, list] = {} # labels -> [count per bucket (non-kumulatif) + inf, sum]
+
+    def observe(self, value: float, labels: tuple = ()) -> None:
+        data = self._values.get(labels)
+        if data is None:
+            data = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        data[0][bisect.bisect_left(self.buckets, value)] += 1
+        data[1] += value
+
+    def samples(self):
+        for labels, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield f"{self.name}_bucket", _format_labels(self.labelnames, labels, f'le="{bound}"'), cumulative
+            cumulative += counts[-1]
+            yield f"{self.name}_bucket", _format_labels(self.labelnames, labels, 'le="+Inf"'), cumulative
+            yield f"{self.name}_sum", _format_labels(self.labelnames, labels), total
+            yield f"{self.name}_count", _format_labels(self.labelnames, labels), cumulative
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list = []
+        self._collectors: list[Callable[[], list]] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], list]) -> None:
+        """Collector dipanggil saat scrape, return list (nama, tipe, help, nilai) buat gauge dinamis."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {value}")
+        for collector in self._collectors:
+            for name, kind, documentation, value in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+HTTP_REQUESTS = registry.register(Counter(
+    "http_requests_total", "Jumlah request HTTP.", ("method", "route", "status")))
+HTTP_LATENCY = registry.register(Histogram(
+    "http_request_duration_seconds", "Latency request HTTP (sampai response selesai dikirim).", ("method", "route")))
+HTTP_IN_FLIGHT = registry.register(Gauge(
+    "http_requests_in_flight", "Request yang sedang diproses.", ("method",)))
+DB_STATEMENTS = registry.register(Histogram(
+    "db_statements_per_request", "Jumlah statement SQL per request.", ("route",), buckets=COUNT_BUCKETS))
+DB_TIME = registry.register(Histogram(
+    "db_time_per_request_seconds", "Total waktu eksekusi SQL per request.", ("route",)))
+OCR_STAGE = registry.register(Histogram(
+    "ocr_stage_duration_seconds", "Durasi tiap tahap pipeline OCR (decode, grayscale, resize, enhance, ocr, parse).", ("stage",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)))
+
+
+# --- Statistik SQL per request ---
+
+class RequestDBStats:
+    __slots__ = ("statements", "seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+
+
+current_db_stats: ContextVar[Optional[RequestDBStats]] = ContextVar("current_db_stats", default=None)
+
+
+# Hook lain yang butuh tiap statement (mis. query_inspector): dipanggil dari listener yang sama,
+# supaya engine cuma punya satu pasang hook cursor & waktu tiap statement cukup diukur sekali
+_statement_observers: list[Callable] = []
+
+
+def add_statement_observer(observer: Callable) -> None:
+    """observer(statement, parameters, executemany, elapsed) dipanggil setelah tiap statement selesai."""
+    _statement_observers.append(observer)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _statement_observers or current_db_stats.get() is not None:
+        context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_metrics_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    stats = current_db_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.seconds += elapsed
+    for observer in _statement_observers:
+        observer(statement, parameters, executemany, elapsed)
+
+
+def instrument_engine(sync_engine) -> None:
+    """Pasang event listener di engine (AsyncEngine.sync_engine) buat hitung statement & waktu SQL per request."""
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# --- Middleware ---
+
+def _route_template(scope) -> str:
+    # Pakai template path ("/api/v1/wallets/{wallet_id}"), bukan path asli, biar jumlah label gak meledak.
+    # Dibaca SETELAH request selesai: router sudah mengisi scope dengan route yang cocok.
+    # FastAPI baru menyimpan route asli (tanpa prefix include_router) di scope["route"],
+    # path lengkapnya ada di effective route context.
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    route = context if context is not None else scope.get("route")
+    return getattr(route, "path_format", None) or "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware murni (bukan BaseHTTPMiddleware, tanpa task/queue tambahan):
+    count + latency per route, in-flight per method, dan jumlah/waktu SQL per request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500 # Kalau exception sebelum response dikirim
+        stats = RequestDBStats()
+        token = current_db_stats.set(stats)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc((method,))
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec((method,))
+            route = _route_template(scope)
+            HTTP_LATENCY.observe(time.perf_counter() - started, (method, route))
+            HTTP_REQUESTS.inc((method, route, str(status)))
+            DB_STATEMENTS.observe(stats.statements, (route,))
+            DB_TIME.observe(stats.seconds, (route,))
+            current_db_stats.reset(token)
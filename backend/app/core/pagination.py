@@ -0,0 +1,28 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+
+
+def encode_cursor(date: datetime, id: int) -> str:
+    """
+    Bungkus posisi terakhir (date, id) jadi string opaque buat client.
+    Client cukup kirim balik apa adanya, gak perlu tau isinya.
+    """
+    raw = json.dumps({"d": date.isoformat(), "i": id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """Kebalikan encode_cursor. Cursor rusak/asal-asalan -> 400."""
+    if not cursor:
+        return None
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(data["d"]), int(data["i"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor tidak valid")
@@ -0,0 +1,149 @@
+import logging
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from app.core.metrics import add_statement_observer
+
+# Hook engine buat nangkap regresi query sebelum sampai production:
+# - query lambat (>= DB_SLOW_QUERY_MS) di-log, nilai parameter TIDAK ikut di-log
+# - statement per request dihitung, statement yang bentuknya sama berulang >= N kali
+#   ditandai sebagai kemungkinan N+1 (lazy load relationship di dalam loop)
+# - assert_max_queries() buat ngunci budget query per endpoint di test
+
+logger = logging.getLogger(__name__)
+
+MAX_LOGGED_SQL = 1000
+
+_PLACEHOLDER = r"(?:\$\d+|\?|:\w+|%\(\w+\)s|%s)"
+_PLACEHOLDER_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)")
+_NUMBER = re.compile(r"\b\d+\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """
+    Normalisasi SQL jadi "bentuk"-nya: IN (...) sepanjang apapun -> IN (?), angka -> ?.
+    Dua statement dengan shape sama = query yang sama, cuma beda parameter.
+    """
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _PLACEHOLDER_LIST.sub("(?)", shape)
+    return _NUMBER.sub("?", shape)
+
+
+def _redacted(statement: str, parameters, executemany: bool) -> str:
+    sql = _WHITESPACE.sub(" ", statement).strip()
+    if len(sql) > MAX_LOGGED_SQL:
+        sql = sql[:MAX_LOGGED_SQL] + "..."
+    if executemany:
+        return f"{sql} [{len(parameters or ())} baris parameter disembunyikan]"
+    return f"{sql} [{len(parameters or ())} parameter disembunyikan]"
+
+
+class QueryLog:
+    """Statement yang jalan selama satu request / satu blok test."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.seconds += elapsed
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Shape yang jalan >= threshold kali (kandidat N+1), yang paling sering duluan."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+# Tuple supaya bisa nested (middleware + assert_max_queries di test jalan bareng)
+_active_logs: ContextVar[tuple] = ContextVar("active_query_logs", default=())
+
+
+@contextmanager
+def track_queries():
+    """Catat semua statement yang dieksekusi di context ini (ikut ke greenlet SQLAlchemy async)."""
+    log = QueryLog()
+    token = _active_logs.set(_active_logs.get() + (log,))
+    try:
+        yield log
+    finally:
+        _active_logs.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit: int, repeat_threshold: Optional[int] = None):
+    """
+    Gagal (AssertionError) kalau blok menjalankan lebih dari `limit` statement,
+    atau ada statement yang sama berulang >= `repeat_threshold` kali (kalau diisi).
+
+        with assert_max_queries(2, repeat_threshold=2):
+            await get_transactions(limit=50, cursor=None, legacy=False, current_user=user, db=db)
+
+    Buat pytest cukup expose lewat fixture:
+
+        @pytest.fixture
+        def query_budget():
+            return assert_max_queries
+    """
+    with track_queries() as log:
+        yield log
+
+    problems = []
+    if log.count > limit:
+        problems.append(f"{log.count} statement, budget {limit}")
+    if repeat_threshold:
+        problems += [f"kemungkinan N+1 ({count}x): {shape}" for shape, count in log.repeated(repeat_threshold)]
+    if problems:
+        statements = "\n".join(f"  {count}x {shape}" for shape, count in log.shapes.most_common())
+        raise AssertionError("; ".join(problems) + "\nStatement:\n" + statements)
+
+
+def enable_query_inspector(slow_query_ms: int = 0) -> None:
+    """
+    Daftarkan inspector ke hook cursor milik metrics (instrument_engine), bukan listener sendiri.
+    slow_query_ms=0 -> log query lambat off.
+    """
+    slow_seconds = slow_query_ms / 1000 if slow_query_ms > 0 else None
+
+    def observe(statement, parameters, executemany, elapsed):
+        if slow_seconds is not None and elapsed >= slow_seconds:
+            logger.warning("Query lambat %.1f ms: %s", elapsed * 1000, _redacted(statement, parameters, executemany))
+        for log in _active_logs.get():
+            log.record(statement, elapsed)
+
+    add_statement_observer(observe)
+
+
+class QueryInspectorMiddleware:
+    """
+    ASGI middleware (mode debug / test): hitung statement per request, tambahkan header
+    X-DB-Queries, dan log warning kalau ada statement yang sama berulang >= threshold kali.
+    """
+
+    def __init__(self, app, threshold: int = 5):
+        self.app = app
+        self.threshold = threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as log:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    # Statement setelah header terkirim (streaming) tidak ikut di angka header, tapi tetap dicek N+1
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-db-queries", str(log.count).encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+        for shape, count in log.repeated(self.threshold):
+            logger.warning("Kemungkinan N+1 di %s %s: %dx %s", scope["method"], scope["path"], count, shape)
@@ -0,0 +1,22 @@
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value) # Sama dengan Pydantic mode JSON: Decimal jadi string ("1250.00")
+    raise TypeError(f"Type {type(value).__name__} tidak bisa di-serialize ke JSON")
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSONResponse versi orjson buat list besar yang sudah diproyeksikan jadi dict (tanpa model Pydantic per baris).
+    Output byte-per-byte sama dengan jalur response_model biasa untuk tipe yang kita pakai:
+    Decimal -> string, datetime UTC -> "...Z", Enum -> value, karakter non-ASCII tidak di-escape.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
@@ -1,12 +1,31 @@
-from fastapi import FastAPI
+import secrets
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.core.config import settings
+from app.core.database import engine, pool_status
+from app.core.metrics import MetricsMiddleware, registry
+from app.core.query_inspector import QueryInspectorMiddleware
 from app.routers import auth, wallets
 from app.routers import transactions
 from app.routers import health
+from app.routers import reports
 from app.routers import ocr
+from app.services.ocr_engine import ocr_engine
+from app.services.ocr_jobs import ocr_jobs
 
-app = FastAPI(title=settings.APP_NAME)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Shutdown: batalkan job OCR yang masih jalan & matikan worker-nya
+    ocr_jobs.shutdown()
+    ocr_engine.shutdown()
+    # Tutup semua koneksi pool dengan rapi (gak ninggalin koneksi idle di Postgres / PgBouncer)
+    await engine.dispose()
+
+app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -16,8 +35,47 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.DEBUG or settings.DB_QUERY_INSPECT:
+    app.add_middleware(QueryInspectorMiddleware, threshold=settings.DB_N_PLUS_ONE_THRESHOLD)
+
+# Paling luar, supaya latency yang tercatat sudah termasuk middleware lain
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["Auth"])
 app.include_router(wallets.router, prefix="/api/v1/wallets", tags=["Wallets"])
 app.include_router(transactions.router, prefix="/api/v1/transactions", tags=["Transactions"])
 app.include_router(health.router, prefix="/api/v1/health", tags=["Analysis"])
-app.include_router(ocr.router, prefix="/api/v1/ocr", tags=["OCR"])
\ No newline at end of file
+app.include_router(reports.router, prefix="/api/v1/reports", tags=["Analysis"])
+app.include_router(ocr.router, prefix="/api/v1/ocr", tags=["OCR"])
+
+if settings.DEBUG or settings.INTERNAL_ENDPOINTS:
+    # Tanpa auth: cuma didaftarkan kalau sengaja diaktifkan (dan port-nya gak terbuka ke publik)
+    @app.get("/internal/db-pool", tags=["System"])
+    async def get_db_pool_status():
+        """
+        Kondisi connection pool DB worker ini: saturasi & waktu tunggu checkout.
+        Waktu tunggu naik / ada timeout -> DB_POOL_SIZE / DB_MAX_OVERFLOW kekecilan buat beban sekarang.
+        """
+        return pool_status()
+
+def _pool_metrics() -> list:
+    status = pool_status()
+    return [
+        ("db_pool_checked_out", "gauge", "Koneksi DB yang sedang dipakai.", status["checked_out"]),
+        ("db_pool_saturation", "gauge", "checked_out / (pool_size + max_overflow).", status["saturation"]),
+        ("db_pool_checkouts_total", "counter", "Jumlah checkout koneksi sukses.", status["checkouts"]),
+        ("db_pool_checkout_timeouts_total", "counter", "Checkout yang timeout (pool penuh).", status["checkout_timeouts"]),
+        ("db_pool_checkout_wait_max_seconds", "gauge", "Waktu tunggu checkout terlama.", status["checkout_wait_max_ms"] / 1000),
+    ]
+
+registry.add_collector(_pool_metrics)
+
+if settings.DEBUG or settings.INTERNAL_ENDPOINTS or settings.METRICS_TOKEN:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics(authorization: Optional[str] = Header(None)):
+        """Metrics format Prometheus text (per worker uvicorn)."""
+        if settings.METRICS_TOKEN and not secrets.compare_digest(
+            (authorization or "").encode(), f"Bearer {settings.METRICS_TOKEN}".encode()
+        ):
+            raise HTTPException(status_code=401, detail="Token metrics tidak valid")
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
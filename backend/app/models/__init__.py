@@ -1,5 +1,5 @@
 from app.models.base import Base
 from app.models.user import User
 from app.models.wallet import Wallet
-from app.models.transaction import Transaction, Category
+from app.models.transaction import Transaction, Category, DailySpending
 # Nanti Transaction juga import ke sini
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Numeric, DateTime, Boolean, Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, Numeric, DateTime, Date, Boolean, Enum, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -26,6 +26,11 @@ class Category(Base, SoftDeleteMixin):
     owner = relationship("User", backref="categories")
     transactions = relationship("Transaction", back_populates="category")
 
+    __table_args__ = (
+        # GET /transactions/categories -> WHERE user_id = ?
+        Index("ix_categories_user_id", user_id),
+    )
+
 # --- TABEL TRANSAKSI ---
 class Transaction(Base, SoftDeleteMixin):
     __tablename__ = "transactions"
@@ -46,4 +51,33 @@ class Transaction(Base, SoftDeleteMixin):
     # Relasi
     wallet = relationship("Wallet", foreign_keys=[wallet_id])
     target_wallet = relationship("Wallet", foreign_keys=[target_wallet_id])
-    category = relationship("Category", back_populates="transactions")
\ No newline at end of file
+    category = relationship("Category", back_populates="transactions")
+
+    __table_args__ = (
+        # List transaksi (keyset): WHERE user_id = ? AND deleted_at IS NULL ORDER BY date DESC, id DESC
+        Index(
+            "ix_transactions_user_date_active",
+            user_id, date.desc(), id.desc(),
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        # Health check / laporan: WHERE user_id = ? AND type = ? AND date BETWEEN ...
+        Index(
+            "ix_transactions_user_type_date_active",
+            user_id, type, date,
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+    )
+
+# --- TABEL ROLLUP HARIAN ---
+# Total transaksi per user / hari / kategori / tipe. Di-update di DB transaction yang sama
+# dengan insert/edit/hapus transaksi (lihat app/services/daily_spending.py), jadi health check
+# & laporan cukup baca O(hari) baris, bukan O(transaksi).
+class DailySpending(Base):
+    __tablename__ = "daily_spending"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True) # Tanggal (UTC) dari Transaction.date
+    category_id = Column(Integer, primary_key=True, default=0) # 0 = tanpa kategori (Transfer)
+    type = Column(Enum(TransactionType), primary_key=True)
+    total = Column(Numeric(18, 2), nullable=False, default=0)
+    tx_count = Column(Integer, nullable=False, default=0)
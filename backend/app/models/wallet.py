@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Numeric, Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, Numeric, Enum, Index, text
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from app.models.base import SoftDeleteMixin
@@ -17,6 +17,13 @@ class Wallet(Base, SoftDeleteMixin):
     name = Column(String, nullable=False)  # Contoh: "BCA Utama"
     type = Column(String, nullable=False)  # Disimpan sebagai string di DB
     balance = Column(Numeric(15, 2), default=0) # Support angka besar desimal
+    # Saldo awal saat dompet dibuat. Rekonsiliasi: balance == opening_balance + net semua transaksi
+    opening_balance = Column(Numeric(15, 2), nullable=False, default=0, server_default="0")
 
     # Relasi balik ke User
-    owner = relationship("User", back_populates="wallets")
\ No newline at end of file
+    owner = relationship("User", back_populates="wallets")
+
+    __table_args__ = (
+        # GET /wallets & total saldo di health check: WHERE user_id = ? AND deleted_at IS NULL
+        Index("ix_wallets_user_active", user_id, postgresql_where=text("deleted_at IS NULL")),
+    )
@@ -4,6 +4,7 @@ from sqlalchemy.future import select
 from fastapi.security import OAuth2PasswordRequestForm
 from typing import Any
 
+from app.api.deps import invalidate_user_cache
 from app.core.database import get_db
 from app.core.security import get_password_hash, verify_password, create_access_token
 from app.models.user import User
@@ -31,7 +32,7 @@ async def register(user_in: UserCreate, db: AsyncSession = Depends(get_db)) -> A
     new_user = User(
         email=user_in.email,
         full_name=user_in.full_name,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=await get_password_hash(user_in.password),
         avatar_url=user_in.avatar_url
     )
 
@@ -39,6 +40,7 @@ async def register(user_in: UserCreate, db: AsyncSession = Depends(get_db)) -> A
     db.add(new_user)
     await db.commit()
     await db.refresh(new_user)
+    invalidate_user_cache(new_user.id) # Jaga-jaga snapshot lama dengan id yang sama (mis. DB habis di-reset)
 
     return new_user
 
@@ -58,7 +60,7 @@ async def login(
     user = result.scalars().first()
 
     # 2. Validasi User & Password
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email atau password salah bro.",
@@ -6,18 +6,18 @@ from datetime import datetime, timedelta
 import calendar
 from decimal import Decimal
 
-from app.api.deps import get_current_user
+from app.api.deps import get_current_principal, Principal
 from app.core.database import get_db
-from app.models.user import User
 from app.models.wallet import Wallet
-from app.models.transaction import Transaction, TransactionType, Category
+from app.models.transaction import DailySpending, TransactionType, Category
 from app.schemas.health import HealthCheckResponse, HealthStatus
+from app.services.health_cache import get_cached_health, cache_health
 
 router = APIRouter()
 
 @router.get("/", response_model=HealthCheckResponse)
 async def check_financial_health(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -37,27 +37,35 @@ async def check_financial_health(
     days_remaining = last_day - days_passed
     if days_remaining == 0: days_remaining = 1 # Hindari pembagian 0 di akhir bulan
 
-    # 2. Hitung Total Aset (Semua Dompet)
-    wallet_res = await db.execute(
+    # Repeat load (dashboard) dijawab dari cache; di-invalidate tiap ada write wallet/transaksi
+    cached = get_cached_health(current_user.id, today.date())
+    if cached is not None:
+        return cached
+
+    # 2. Total Aset (Semua Dompet) & 3. Pengeluaran Variable Bulan Ini (Makan, Jajan, Transport)
+    # Dua-duanya scalar subquery dalam SATU SELECT -> 1 round trip ke DB.
+    # Kita exclude 'Fixed Cost' (Sewa Kost/Cicilan) karena itu pengeluaran pasti, bukan gaya hidup harian.
+    # Pengeluaran dibaca dari rollup harian: maks ~31 baris per kategori, berapapun jumlah transaksinya.
+    total_balance_q = (
         select(func.sum(Wallet.balance))
         .where(Wallet.user_id == current_user.id, Wallet.deleted_at == None)
+        .scalar_subquery()
     )
-    total_balance = wallet_res.scalar() or Decimal(0)
-
-    # 3. Hitung Pengeluaran Variable Bulan Ini (Makan, Jajan, Transport)
-    # Kita exclude 'Fixed Cost' (Sewa Kost/Cicilan) karena itu pengeluaran pasti, bukan gaya hidup harian.
-    expense_res = await db.execute(
-        select(func.sum(Transaction.amount))
-        .join(Category, Transaction.category_id == Category.id)
+    variable_expense_q = (
+        select(func.sum(DailySpending.total))
+        .join(Category, DailySpending.category_id == Category.id)
         .where(
-            Transaction.user_id == current_user.id,
-            Transaction.type == TransactionType.EXPENSE,
-            Transaction.date >= start_date,
-            Transaction.date <= end_date,
+            DailySpending.user_id == current_user.id,
+            DailySpending.type == TransactionType.EXPENSE,
+            DailySpending.day >= start_date.date(),
+            DailySpending.day <= end_date.date(),
             Category.is_fixed == False # HANYA VARIABLE COST
         )
+        .scalar_subquery()
     )
-    total_variable_expense = expense_res.scalar() or Decimal(0)
+    totals = (await db.execute(select(total_balance_q, variable_expense_q))).one()
+    total_balance = totals[0] or Decimal(0)
+    total_variable_expense = totals[1] or Decimal(0)
 
     # 4. Hitung Burn Rate (Rata-rata boros per hari)
     burn_rate = total_variable_expense / Decimal(days_passed)
@@ -78,7 +86,7 @@ async def check_financial_health(
         status = HealthStatus.WARNING
         msg = "Hati-hati, uangmu mulai menipis. Kurangi jajan kopi! ☕❌"
 
-    return HealthCheckResponse(
+    response = HealthCheckResponse(
         total_balance=total_balance,
         total_variable_expense=total_variable_expense,
         average_daily_burn_rate=round(burn_rate, 2),
@@ -86,4 +94,6 @@ async def check_financial_health(
         days_remaining=days_remaining,
         status=status,
         message=msg
-    )
\ No newline at end of file
+    )
+    cache_health(current_user.id, today, response)
+    return response
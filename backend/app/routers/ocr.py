@@ -1,22 +1,114 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from app.services.ocr import extract_receipt_data
+import asyncio
+import io
+from typing import Optional
+
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from PIL import Image
+from app.core.config import settings
+from app.schemas.ocr import OCRJobResponse, OCRJobStatus, ReceiptData, BatchScanItem, BatchScanResponse
+from app.services.ocr_cache import ocr_cache
+from app.services.ocr_engine import ocr_engine, OCRBusyError, OCRTimeoutError
+from app.services.ocr_jobs import ocr_jobs, OCRJob
 
 router = APIRouter()
 
+UPLOAD_CHUNK_SIZE = 256 * 1024
+
+# Format asli ditentukan dari magic bytes, Content-Type dari client gak dipercaya
+IMAGE_SIGNATURES = {
+    b"\xff\xd8\xff": "JPEG",
+    b"\x89PNG\r\n\x1a\n": "PNG",
+}
+
+def _busy_exception() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Server OCR lagi sibuk, coba lagi sebentar ya.",
+        headers={"Retry-After": "5"}
+    )
+
+def _detect_image_format(head: bytes) -> Optional[str]:
+    for signature, image_format in IMAGE_SIGNATURES.items():
+        if head.startswith(signature):
+            return image_format
+    return None
+
+def _check_dimensions(content: bytes, image_format: str) -> None:
+    # Image.open cuma parsing header (ukuran), bitmap-nya belum dialokasikan.
+    # Gambar yang kegedean ditolak di sini, sebelum sempat di-decode di worker OCR.
+    try:
+        with Image.open(io.BytesIO(content), formats=[image_format]) as image:
+            width, height = image.size
+    except Image.DecompressionBombError:
+        width, height = settings.OCR_MAX_IMAGE_PIXELS + 1, 1
+    except (OSError, SyntaxError, ValueError):
+        raise HTTPException(status_code=400, detail="File gambar rusak atau formatnya tidak didukung")
+
+    if width * height > settings.OCR_MAX_IMAGE_PIXELS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Resolusi gambar terlalu besar (maks {settings.OCR_MAX_IMAGE_PIXELS // 1_000_000} MP)"
+        )
+
+async def _read_image(file: UploadFile) -> bytes:
+    """
+    Baca upload per chunk dengan batas ukuran (OCR_MAX_UPLOAD_MB), berhenti begitu lewat batas.
+    Format dicek dari magic bytes & resolusi dari header, sebelum gambar di-decode.
+    """
+    max_bytes = settings.OCR_MAX_UPLOAD_MB * 1024 * 1024
+    too_large = HTTPException(status_code=413, detail=f"Ukuran file maksimal {settings.OCR_MAX_UPLOAD_MB} MB")
+
+    # Ukuran dari multipart sudah diketahui -> langsung tolak tanpa baca isinya
+    if file.size is not None and file.size > max_bytes:
+        raise too_large
+
+    chunks = []
+    total = 0
+    image_format = None
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        if image_format is None:
+            image_format = _detect_image_format(chunk)
+            if image_format is None:
+                raise HTTPException(status_code=400, detail="File harus gambar (JPG/PNG)")
+
+        total += len(chunk)
+        if total > max_bytes:
+            raise too_large
+        chunks.append(chunk)
+
+    if image_format is None:
+        raise HTTPException(status_code=400, detail="File harus gambar (JPG/PNG)")
+
+    content = b"".join(chunks)
+    _check_dimensions(content, image_format)
+    return content
+
+def _job_response(job: OCRJob) -> OCRJobResponse:
+    return OCRJobResponse(
+        job_id=job.id,
+        status=job.status,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+        data=ReceiptData(**job.result) if job.status == OCRJobStatus.DONE else None,
+        error=job.error,
+    )
+
 @router.post("/scan")
 async def scan_receipt(file: UploadFile = File(...)):
     """
     Upload gambar struk, return JSON data hasil scan.
     """
-    # Validasi Tipe File
-    if file.content_type not in ["image/jpeg", "image/png", "image/jpg"]:
-        raise HTTPException(status_code=400, detail="File harus gambar (JPG/PNG)")
-
     # Baca file
-    content = await file.read()
+    content = await _read_image(file)
     
-    # Proses OCR
-    result = await extract_receipt_data(content)
+    # Proses OCR (di process pool, event loop gak ke-block)
+    try:
+        result = await ocr_engine.run(content)
+    except OCRBusyError:
+        raise _busy_exception()
+    except OCRTimeoutError:
+        raise HTTPException(status_code=504, detail="Proses scan kelamaan, coba foto yang lebih jelas")
     
     if result.get("error"):
         raise HTTPException(status_code=500, detail="Gagal memproses gambar")
@@ -28,4 +120,129 @@ async def scan_receipt(file: UploadFile = File(...)):
             "amount": result["amount"],
             # Kita belum detect tanggal canggih, sementara return hari ini di frontend nanti
         }
-    }
\ No newline at end of file
+    }
+
+# --- BATCH SCAN ---
+# Buat user yang upload banyak struk sekaligus (rekap mingguan), cukup 1 request.
+
+async def _scan_batch_item(index: int, file: UploadFile, semaphore: asyncio.Semaphore) -> BatchScanItem:
+    # Semua error ditangkap per file, jadi 1 gambar rusak gak menggagalkan batch
+    item = BatchScanItem(index=index, filename=file.filename, status="error")
+
+    async with semaphore:
+        # Dibaca di dalam slot: paling banyak `workers` file yang isinya ada di memori sekaligus,
+        # bukan OCR_BATCH_MAX_FILES x OCR_MAX_UPLOAD_MB per request
+        try:
+            content = await _read_image(file)
+        except HTTPException as e:
+            item.error = e.detail
+            return item
+
+        try:
+            result = await ocr_engine.run(content)
+        except OCRBusyError:
+            item.error = "Server OCR lagi sibuk, coba lagi sebentar ya."
+            return item
+        except OCRTimeoutError:
+            item.error = "Proses scan kelamaan, coba foto yang lebih jelas"
+            return item
+
+    if result.get("error"):
+        item.error = "Gagal memproses gambar"
+        return item
+
+    item.status = "success"
+    item.data = ReceiptData(merchant=result["merchant"], amount=result["amount"])
+    return item
+
+async def _start_batch(files: list[UploadFile]) -> list[asyncio.Task]:
+    if not files:
+        raise HTTPException(status_code=400, detail="Minimal 1 file")
+    if len(files) > settings.OCR_BATCH_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"Maksimal {settings.OCR_BATCH_MAX_FILES} file per batch")
+
+    # UploadFile baru ditutup FastAPI setelah response selesai dikirim (termasuk yang di-stream),
+    # jadi tiap file aman dibaca belakangan di task-nya sendiri.
+    # Per batch maksimal `workers` gambar jalan bareng: 1 batch gak menghabiskan antrian
+    # engine (yang bikin request lain kena 503), tapi semua core tetap kepakai.
+    semaphore = asyncio.Semaphore(ocr_engine.workers)
+    return [
+        asyncio.create_task(_scan_batch_item(index, file, semaphore))
+        for index, file in enumerate(files)
+    ]
+
+@router.post("/scan/batch", response_model=BatchScanResponse)
+async def scan_receipts_batch(
+    files: list[UploadFile] = File(...),
+    stream: bool = Query(False)
+):
+    """
+    Upload banyak gambar struk sekaligus (maks OCR_BATCH_MAX_FILES), diproses paralel.
+    Hasil per file ada di `results` (urut sesuai upload), file yang gagal punya status "error".
+    - ?stream=false (Default): Tunggu semua selesai, return 1 JSON.
+    - ?stream=true: NDJSON, 1 baris per file begitu file itu selesai (urutan bisa acak, lihat `index`).
+    """
+    tasks = await _start_batch(files)
+
+    if stream:
+        async def generate():
+            try:
+                for finished in asyncio.as_completed(tasks):
+                    item = await finished
+                    yield item.model_dump_json() + "\n"
+            finally:
+                # Client putus di tengah jalan -> sisa scan dibatalkan
+                for task in tasks:
+                    task.cancel()
+
+        return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+    results = await asyncio.gather(*tasks)
+    succeeded = sum(1 for item in results if item.status == "success")
+    return BatchScanResponse(
+        total=len(results),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        results=results,
+    )
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """
+    Statistik cache hasil OCR (hit/miss) buat lihat berapa banyak OCR ulang yang kehemat.
+    """
+    return ocr_cache.stats()
+
+# --- JOB API (Submit & Poll) ---
+# Cocok buat jaringan mobile: koneksi gak perlu ditahan selama Tesseract jalan.
+
+@router.post("/jobs", response_model=OCRJobResponse, status_code=202)
+async def submit_scan_job(file: UploadFile = File(...)):
+    """
+    Upload gambar struk, langsung dapat `job_id` (status queued).
+    Hasilnya diambil lewat GET /ocr/jobs/{job_id}.
+    """
+    content = await _read_image(file)
+
+    try:
+        job = await ocr_jobs.submit(content)
+    except OCRBusyError:
+        raise _busy_exception()
+
+    return _job_response(job)
+
+@router.get("/jobs/{job_id}", response_model=OCRJobResponse)
+async def get_scan_job(
+    job_id: str,
+    wait: int = Query(0, ge=0, le=settings.OCR_JOB_MAX_WAIT_SECONDS)
+):
+    """
+    Cek status job scan.
+    - ?wait=0 (Default): Polling biasa, langsung balik.
+    - ?wait=N: Long-poll, tunggu maks N detik sampai job selesai (done/failed).
+    """
+    job = await ocr_jobs.get(job_id, wait=wait)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job tidak ditemukan atau sudah kedaluwarsa")
+
+    return _job_response(job)
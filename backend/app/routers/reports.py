@@ -0,0 +1,228 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import Date, case, cast, literal, literal_column, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.sql import func
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional
+
+from app.api.deps import get_current_principal, Principal
+from app.core.database import get_db
+from app.models.wallet import Wallet
+from app.models.transaction import Transaction, TransactionType, Category, DailySpending
+from app.schemas.report import (
+    CategoryReport, CategorySpending, CashflowReport, CashflowPoint,
+    MerchantReport, MerchantSpending, WalletFlowReport, WalletFlow,
+)
+
+router = APIRouter()
+
+# Semua agregasi jalan di DB (GROUP BY + window function), response cuma beberapa ratus byte.
+# Laporan per kategori & cashflow dibaca dari rollup harian (daily_spending),
+# merchant & wallet butuh kolom yang gak ada di rollup jadi baca transactions (pakai index user+type+date).
+
+def _date_range(start: Optional[date], end: Optional[date], default_months: int = 1) -> tuple[date, date]:
+    """Default: dari awal bulan (default_months - 1) bulan lalu sampai hari ini."""
+    end = end or date.today()
+    if start is None:
+        year, month = divmod(end.year * 12 + end.month - default_months, 12)
+        start = date(year, month + 1, 1)
+    if start > end:
+        raise HTTPException(status_code=400, detail="Tanggal mulai harus sebelum tanggal akhir")
+    return start, end
+
+def _utc_bounds(start: date, end: date) -> tuple[datetime, datetime]:
+    # Sama dengan bucket rollup harian: hari dihitung dalam UTC, end inklusif
+    return (
+        datetime.combine(start, time.min, tzinfo=timezone.utc),
+        datetime.combine(end + timedelta(days=1), time.min, tzinfo=timezone.utc),
+    )
+
+@router.get("/spending-by-category", response_model=CategoryReport)
+async def spending_by_category(
+    start: Optional[date] = Query(None),
+    end: Optional[date] = Query(None),
+    trx_type: TransactionType = Query(TransactionType.EXPENSE, alias="type"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Total per kategori dalam range (default: bulan ini), urut dari yang terbesar.
+    - ?type=EXPENSE (Default) / INCOME
+    `share` = persen dari total periode (window function, tanpa query kedua).
+    """
+    start, end = _date_range(start, end)
+    total = func.sum(DailySpending.total)
+
+    result = await db.execute(
+        select(
+            DailySpending.category_id,
+            Category.name,
+            total.label("total"),
+            func.sum(DailySpending.tx_count).label("count"),
+            func.round(total * 100 / func.nullif(func.sum(total).over(), 0), 2).label("share"),
+        )
+        .outerjoin(Category, DailySpending.category_id == Category.id)
+        .where(
+            DailySpending.user_id == current_user.id,
+            DailySpending.type == trx_type,
+            DailySpending.day >= start,
+            DailySpending.day <= end,
+            DailySpending.tx_count > 0,
+        )
+        .group_by(DailySpending.category_id, Category.name)
+        .order_by(total.desc())
+    )
+
+    items = [
+        CategorySpending(
+            category_id=row.category_id or None,
+            name=row.name or "Tanpa Kategori",
+            total=row.total,
+            count=row.count,
+            share=row.share or 0,
+        )
+        for row in result
+    ]
+    return CategoryReport(start=start, end=end, total=sum((item.total for item in items), 0), items=items)
+
+@router.get("/cashflow", response_model=CashflowReport)
+async def cashflow(
+    period: str = Query("month", pattern="^(month|week)$"),
+    start: Optional[date] = Query(None),
+    end: Optional[date] = Query(None),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Income vs Expense per bulan / minggu (default: 6 bulan terakhir).
+    - ?period=month (Default) / week (minggu mulai Senin)
+    Transfer tidak dihitung (cuma pindah dompet, bukan pemasukan/pengeluaran).
+    """
+    start, end = _date_range(start, end, default_months=6)
+
+    # Unit ditulis literal (bukan bind param) supaya ekspresi di SELECT & GROUP BY identik di mata Postgres.
+    # Aman: `period` sudah divalidasi pattern month|week.
+    bucket = cast(func.date_trunc(literal_column(f"'{period}'"), DailySpending.day), Date)
+    income = func.sum(case((DailySpending.type == TransactionType.INCOME, DailySpending.total), else_=0))
+    expense = func.sum(case((DailySpending.type == TransactionType.EXPENSE, DailySpending.total), else_=0))
+
+    result = await db.execute(
+        select(
+            bucket.label("period"),
+            income.label("income"),
+            expense.label("expense"),
+            func.sum(income - expense).over(order_by=bucket).label("cumulative_net"),
+        )
+        .where(
+            DailySpending.user_id == current_user.id,
+            DailySpending.type.in_([TransactionType.INCOME, TransactionType.EXPENSE]),
+            DailySpending.day >= start,
+            DailySpending.day <= end,
+        )
+        .group_by(bucket)
+        .order_by(bucket)
+    )
+
+    items = [
+        CashflowPoint(
+            period=row.period,
+            income=row.income,
+            expense=row.expense,
+            net=row.income - row.expense,
+            cumulative_net=row.cumulative_net,
+        )
+        for row in result
+    ]
+    return CashflowReport(start=start, end=end, period=period, items=items)
+
+@router.get("/top-merchants", response_model=MerchantReport)
+async def top_merchants(
+    start: Optional[date] = Query(None),
+    end: Optional[date] = Query(None),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Tempat belanja terbesar berdasarkan deskripsi transaksi EXPENSE (default: bulan ini).
+    Deskripsi dikelompokkan case-insensitive ("Indomaret" = "INDOMARET ").
+    """
+    start, end = _date_range(start, end)
+    range_start, range_end = _utc_bounds(start, end)
+
+    merchant_key = func.lower(func.trim(Transaction.description))
+    total = func.sum(Transaction.amount)
+
+    result = await db.execute(
+        select(
+            func.min(func.trim(Transaction.description)).label("description"),
+            total.label("total"),
+            func.count().label("count"),
+            func.rank().over(order_by=total.desc()).label("rank"),
+        )
+        .where(
+            Transaction.user_id == current_user.id,
+            Transaction.type == TransactionType.EXPENSE,
+            Transaction.date >= range_start,
+            Transaction.date < range_end,
+            Transaction.deleted_at == None,
+            func.coalesce(merchant_key, "") != "",
+        )
+        .group_by(merchant_key)
+        .order_by(total.desc())
+        .limit(limit)
+    )
+
+    items = [MerchantSpending(rank=row.rank, description=row.description, total=row.total, count=row.count) for row in result]
+    return MerchantReport(start=start, end=end, items=items)
+
+@router.get("/wallet-flow", response_model=WalletFlowReport)
+async def wallet_flow(
+    start: Optional[date] = Query(None),
+    end: Optional[date] = Query(None),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Uang masuk & keluar per dompet (default: bulan ini).
+    Transfer dihitung 2 kali: keluar dari dompet sumber, masuk ke dompet tujuan.
+    """
+    start, end = _date_range(start, end)
+    range_start, range_end = _utc_bounds(start, end)
+    active_in_range = (
+        Transaction.user_id == current_user.id,
+        Transaction.date >= range_start,
+        Transaction.date < range_end,
+        Transaction.deleted_at == None,
+    )
+
+    # Tiap transaksi dipecah jadi "kaki" per dompet, lalu dijumlah per dompet dalam 1 query
+    legs = union_all(
+        select(
+            Transaction.wallet_id.label("wallet_id"),
+            case((Transaction.type == TransactionType.INCOME, Transaction.amount), else_=0).label("inflow"),
+            case((Transaction.type != TransactionType.INCOME, Transaction.amount), else_=0).label("outflow"),
+        ).where(*active_in_range),
+        select(
+            Transaction.target_wallet_id,
+            Transaction.amount,
+            literal(0),
+        ).where(*active_in_range, Transaction.type == TransactionType.TRANSFER, Transaction.target_wallet_id != None),
+    ).subquery()
+
+    inflow = func.sum(legs.c.inflow)
+    outflow = func.sum(legs.c.outflow)
+    result = await db.execute(
+        select(Wallet.id, Wallet.name, inflow.label("inflow"), outflow.label("outflow"))
+        .join(legs, legs.c.wallet_id == Wallet.id)
+        .where(Wallet.user_id == current_user.id)
+        .group_by(Wallet.id, Wallet.name)
+        .order_by((inflow + outflow).desc())
+    )
+
+    items = [
+        WalletFlow(wallet_id=row.id, name=row.name, inflow=row.inflow, outflow=row.outflow, net=row.inflow - row.outflow)
+        for row in result
+    ]
+    return WalletFlowReport(start=start, end=end, items=items)
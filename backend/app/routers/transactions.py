@@ -1,17 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Body, UploadFile, File
+from fastapi.responses import StreamingResponse
+from sqlalchemy import tuple_, update, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
+from typing import AsyncIterator, Optional, Union
+from sqlalchemy.orm.attributes import set_committed_value
+from datetime import date
+from decimal import Decimal
+import csv
+import io
+import json
 
-from app.api.deps import get_current_user
-from app.core.database import get_db
+from app.api.deps import get_current_user, get_current_principal, Principal
+from app.core.database import get_db, SessionLocal
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.responses import ORJSONResponse
 from app.models.user import User
 from app.models.wallet import Wallet
 from app.models.transaction import Transaction, TransactionType, Category
-from app.schemas.transaction import TransactionCreate, TransactionResponse, CategoryCreate, CategoryResponse
+from app.schemas.transaction import TransactionCreate, TransactionResponse, TransactionPage, CategoryCreate, CategoryResponse, TransactionImportResult
+from app.services.transaction_import import import_transactions, parse_csv_rows, MAX_IMPORT_ROWS
+from app.services.daily_spending import add_rollup_delta, apply_rollup_deltas
+from app.services.health_cache import invalidate_health_cache
+from app.services.category_cache import get_user_categories, resolve_categories, invalidate_category_cache
 
 router = APIRouter()
 
+# Berapa baris yang diambil dari DB (server-side cursor) per sekali fetch saat export
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_COLUMNS = ["id", "date", "type", "amount", "wallet_id", "target_wallet_id", "category", "description"]
+
 # --- CATEGORY ENDPOINTS ---
 @router.post("/categories", response_model=CategoryResponse)
 async def create_category(
@@ -22,16 +40,18 @@ async def create_category(
     new_cat = Category(**cat_in.model_dump(), user_id=current_user.id)
     db.add(new_cat)
     await db.commit()
+    invalidate_category_cache(current_user.id)
     await db.refresh(new_cat)
     return new_cat
 
 @router.get("/categories", response_model=list[CategoryResponse])
 async def get_categories(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
-    result = await db.execute(select(Category).where(Category.user_id == current_user.id))
-    return result.scalars().all()
+    # Dari cache per user (0 query kalau sudah pernah di-load)
+    categories = await get_user_categories(db, current_user.id)
+    return ORJSONResponse(list(categories.values()))
 
 # --- TRANSACTION ENDPOINTS ---
 
@@ -51,71 +71,266 @@ async def create_transaction(
     if trx_in.target_wallet_id == 0:
         trx_in.target_wallet_id = None
 
-    # 1. Ambil Dompet Sumber
-    result = await db.execute(select(Wallet).where(Wallet.id == trx_in.wallet_id, Wallet.user_id == current_user.id))
-    wallet = result.scalars().first()
-    
-    if not wallet:
-        raise HTTPException(status_code=404, detail="Dompet sumber tidak ditemukan")
+    if trx_in.type == TransactionType.TRANSFER and not trx_in.target_wallet_id:
+        raise HTTPException(status_code=400, detail="Target wallet wajib untuk transfer")
 
-    # 2. Logic Perubahan Saldo
+    # 1. Kategori (kalau ada) - sekalian dipakai buat nested response, jadi gak perlu re-select
+    category = None
+    if trx_in.category_id:
+        category = await db.get(Category, trx_in.category_id)
+        if not category or category.user_id != current_user.id:
+            raise HTTPException(status_code=404, detail="Kategori tidak ditemukan")
+
+    # 2. Logic Perubahan Saldo (Atomic di DB, bukan read-modify-write di Python)
     if trx_in.type == TransactionType.INCOME:
-        wallet.balance += trx_in.amount
-    
+        if await _apply_balance_delta(db, trx_in.wallet_id, current_user.id, trx_in.amount) is None:
+            raise HTTPException(status_code=404, detail="Dompet sumber tidak ditemukan")
+
     elif trx_in.type == TransactionType.EXPENSE:
-        if wallet.balance < trx_in.amount:
-            raise HTTPException(status_code=400, detail="Saldo tidak cukup bro!")
-        wallet.balance -= trx_in.amount
+        if await _apply_balance_delta(db, trx_in.wallet_id, current_user.id, -trx_in.amount) is None:
+            await _raise_debit_failed(db, trx_in.wallet_id, current_user.id, "Saldo tidak cukup bro!")
 
     elif trx_in.type == TransactionType.TRANSFER:
-        if not trx_in.target_wallet_id:
-            raise HTTPException(status_code=400, detail="Target wallet wajib untuk transfer")
-            
-        target_res = await db.execute(select(Wallet).where(Wallet.id == trx_in.target_wallet_id, Wallet.user_id == current_user.id))
-        target_wallet = target_res.scalars().first()
-        
-        if not target_wallet:
+        # Debit & kredit dalam SATU transaksi DB: kalau salah satu gagal, dua-duanya batal.
+        # Row wallet di-lock urut id (bukan sumber dulu): transfer A->B & B->A yang barengan
+        # ngunci dengan urutan yang sama, jadi gak deadlock.
+        legs = sorted([(trx_in.wallet_id, -trx_in.amount), (trx_in.target_wallet_id, trx_in.amount)])
+        for wallet_id, delta in legs:
+            if await _apply_balance_delta(db, wallet_id, current_user.id, delta) is not None:
+                continue
+            if delta < 0:
+                await _raise_debit_failed(db, wallet_id, current_user.id, "Saldo kurang untuk transfer")
+            await db.rollback()
             raise HTTPException(status_code=404, detail="Dompet tujuan tidak ditemukan")
-            
-        if wallet.balance < trx_in.amount:
-            raise HTTPException(status_code=400, detail="Saldo kurang untuk transfer")
-
-        wallet.balance -= trx_in.amount
-        target_wallet.balance += trx_in.amount
-
-    # 3. Simpan Transaksi
-    new_trx = Transaction(
-        user_id=current_user.id,
-        wallet_id=trx_in.wallet_id,
-        category_id=trx_in.category_id,
-        target_wallet_id=trx_in.target_wallet_id,
-        type=trx_in.type,
-        amount=trx_in.amount,
-        date=trx_in.date,
-        description=trx_in.description
+
+    # 3. Simpan Transaksi (INSERT ... RETURNING: nilai hasil normalisasi DB langsung balik, tanpa re-select)
+    result = await db.execute(
+        insert(Transaction).returning(Transaction),
+        [{
+            "user_id": current_user.id,
+            "wallet_id": trx_in.wallet_id,
+            "category_id": trx_in.category_id,
+            "target_wallet_id": trx_in.target_wallet_id,
+            "type": trx_in.type,
+            "amount": trx_in.amount,
+            "date": trx_in.date,
+            "description": trx_in.description,
+        }]
     )
+    new_trx = result.scalars().one()
+    set_committed_value(new_trx, "category", category) # Nested response tanpa lazy-load
+
+    # 4. Rollup harian (commit bareng transaksinya)
+    await apply_rollup_deltas(db, add_rollup_delta(
+        {}, current_user.id, trx_in.date, trx_in.category_id, trx_in.type, trx_in.amount
+    ))
 
-    db.add(new_trx)
     await db.commit()
-    
-    query = select(Transaction).options(
-        selectinload(Transaction.category) # Load data kategori sekalian!
-    ).where(Transaction.id == new_trx.id)
-    
-    result = await db.execute(query)
-    final_trx = result.scalars().first()
-    
-    return final_trx
+    invalidate_health_cache(current_user.id)
 
-@router.get("/", response_model=list[TransactionResponse])
-async def get_transactions(
+    return new_trx
+
+async def _apply_balance_delta(db: AsyncSession, wallet_id: int, user_id: int, delta: Decimal) -> Optional[Decimal]:
+    """
+    Ubah saldo langsung di DB (1 statement, aman dari lost update):
+        UPDATE wallets SET balance = balance + :delta
+        WHERE id = :id AND user_id = :uid [AND balance >= -:delta] RETURNING balance
+    Return saldo baru, atau None kalau wallet gak ketemu / saldo gak cukup (debit).
+    """
+    query = update(Wallet).where(Wallet.id == wallet_id, Wallet.user_id == user_id)
+    if delta < 0:
+        query = query.where(Wallet.balance >= -delta) # Guard: saldo gak boleh minus
+
+    result = await db.execute(
+        query.values(balance=Wallet.balance + delta)
+        .returning(Wallet.balance)
+        .execution_options(synchronize_session=False)
+    )
+    return result.scalar()
+
+async def _raise_debit_failed(db: AsyncSession, wallet_id: int, user_id: int, insufficient_msg: str) -> None:
+    """Debit gagal: bedakan 'wallet gak ada' (404) vs 'saldo kurang' (400). Cuma jalan di jalur gagal."""
+    await db.rollback()
+    exists = await db.execute(select(Wallet.id).where(Wallet.id == wallet_id, Wallet.user_id == user_id))
+    if exists.scalar() is None:
+        raise HTTPException(status_code=404, detail="Dompet sumber tidak ditemukan")
+    raise HTTPException(status_code=400, detail=insufficient_msg)
+
+# --- BULK IMPORT ---
+
+def _check_import_size(rows: list) -> None:
+    if not rows:
+        raise HTTPException(status_code=400, detail="Data import kosong")
+    if len(rows) > MAX_IMPORT_ROWS:
+        raise HTTPException(status_code=400, detail=f"Maksimal {MAX_IMPORT_ROWS} baris per import")
+
+@router.post("/import", response_model=TransactionImportResult)
+async def import_transactions_json(
+    rows: list[dict] = Body(...),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    # Gunakan selectinload untuk mengambil data Category sekaligus (Eager Loading)
-    query = select(Transaction).options(selectinload(Transaction.category)).where(
-        Transaction.user_id == current_user.id
-    ).order_by(Transaction.date.desc())
-    
-    result = await db.execute(query)
-    return result.scalars().all()
\ No newline at end of file
+    """
+    Bulk import dari JSON array (format tiap item sama dengan POST /transactions).
+    Baris yang gagal validasi dilaporkan di `errors`, baris lain tetap masuk.
+    """
+    _check_import_size(rows)
+    return await import_transactions(rows, current_user.id, db)
+
+@router.post("/import/csv", response_model=TransactionImportResult)
+async def import_transactions_csv(
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Bulk import dari file CSV (export spreadsheet / mutasi bank).
+    Header: wallet_id, amount, type, date, description, category_id, target_wallet_id
+    """
+    try:
+        rows = parse_csv_rows(await file.read())
+    except (UnicodeDecodeError, csv.Error):
+        raise HTTPException(status_code=400, detail="File CSV tidak valid (harus UTF-8)")
+
+    _check_import_size(rows)
+    return await import_transactions(rows, current_user.id, db)
+
+# Kolom yang dibutuhkan TransactionResponse (list transaksi). Kategori TIDAK di-join,
+# ditempel dari cache kategori per user (lihat services/category_cache.py)
+TRANSACTION_LIST_COLUMNS = (
+    Transaction.id,
+    Transaction.amount,
+    Transaction.type,
+    Transaction.description,
+    Transaction.date,
+    Transaction.wallet_id,
+    Transaction.category_id,
+)
+
+def _transaction_row(row, categories: dict[int, dict]) -> dict:
+    # Urutan key = urutan field TransactionResponse, biar JSON-nya identik
+    return {
+        "id": row.id,
+        "amount": row.amount,
+        "type": row.type,
+        "description": row.description,
+        "date": row.date,
+        "wallet_id": row.wallet_id,
+        "category": None if row.category_id is None else categories[row.category_id],
+    }
+
+@router.get("/", response_model=Union[TransactionPage, list[TransactionResponse]])
+async def get_transactions(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None),
+    legacy: bool = Query(False), # True = balikin SEMUA transaksi (format list lama)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    List transaksi user, urut terbaru dulu (date DESC, id DESC).
+    - Default: Keyset pagination. Kirim balik `next_cursor` sebagai ?cursor= buat halaman berikutnya.
+    - ?legacy=true: Format lama (list polos, semua transaksi) buat client versi lama.
+    """
+    # Proyeksi kolom transaksi saja (1 query), kategori dari cache, hasilnya langsung dict -> orjson.
+    # Tanpa objek ORM & model Pydantic per baris: list besar jauh lebih hemat CPU, output JSON tetap sama.
+    query = select(*TRANSACTION_LIST_COLUMNS).where(
+        Transaction.user_id == current_user.id,
+        Transaction.deleted_at == None # Sesuai partial index ix_transactions_user_date_active
+    ).order_by(Transaction.date.desc(), Transaction.id.desc())
+
+    if legacy:
+        rows = (await db.execute(query)).all()
+        categories = await resolve_categories(db, current_user.id, {row.category_id for row in rows})
+        return ORJSONResponse([_transaction_row(row, categories) for row in rows])
+
+    # Keyset: lanjut dari posisi terakhir, BUKAN pakai OFFSET (tetap kena index di halaman berapapun)
+    position = decode_cursor(cursor)
+    if position:
+        query = query.where(tuple_(Transaction.date, Transaction.id) < tuple_(*position))
+
+    # Ambil lebih 1 buat tau masih ada halaman berikutnya atau tidak
+    result = await db.execute(query.limit(limit + 1))
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].date, rows[-1].id)
+
+    categories = await resolve_categories(db, current_user.id, {row.category_id for row in rows})
+    return ORJSONResponse({"items": [_transaction_row(row, categories) for row in rows], "next_cursor": next_cursor})
+
+# --- EXPORT (Streaming) ---
+
+async def _stream_export(user_id: int, fmt: str) -> AsyncIterator[str]:
+    """
+    Generator export: ambil transaksi per chunk pakai server-side cursor,
+    langsung tulis & kirim ke client. Memory tetap flat walau history jutaan baris.
+    """
+    # Cuma ambil kolom yang diexport (bukan ORM object + Pydantic per baris)
+    query = select(
+        Transaction.id,
+        Transaction.date,
+        Transaction.type,
+        Transaction.amount,
+        Transaction.wallet_id,
+        Transaction.target_wallet_id,
+        Category.name,
+        Transaction.description,
+    ).outerjoin(Category, Transaction.category_id == Category.id).where(
+        Transaction.user_id == user_id,
+        Transaction.deleted_at == None
+    ).order_by(Transaction.date.desc(), Transaction.id.desc()).execution_options(yield_per=EXPORT_CHUNK_SIZE)
+
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        yield buffer.getvalue() # Header langsung dikirim sebelum query selesai
+
+    # Session sendiri: session dari get_db bisa sudah ditutup saat response di-stream
+    async with SessionLocal() as db:
+        result = await db.stream(query)
+
+        async for rows in result.partitions():
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+
+            for row in rows:
+                values = [
+                    row[0],
+                    row[1].isoformat() if row[1] else None,
+                    row[2].value,
+                    str(row[3]),
+                    row[4],
+                    row[5],
+                    row[6],
+                    row[7],
+                ]
+                if fmt == "csv":
+                    writer.writerow(["" if v is None else v for v in values])
+                else:
+                    buffer.write(json.dumps(dict(zip(EXPORT_COLUMNS, values))) + "\n")
+
+            yield buffer.getvalue()
+
+@router.get("/export")
+async def export_transactions(
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """
+    Export SELURUH history transaksi (buat accounting).
+    - ?format=csv (Default)
+    - ?format=ndjson: Satu JSON object per baris.
+    Response di-stream per chunk, jadi byte pertama keluar sebelum query selesai.
+    """
+    media_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    filename = f"transactions-{date.today():%Y%m%d}.{fmt}"
+
+    return StreamingResponse(
+        _stream_export(current_user.id, fmt),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -3,31 +3,34 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from typing import List
 
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, get_current_principal, Principal
 from app.core.database import get_db
+from app.core.responses import ORJSONResponse
 from app.models.user import User
 from app.models.wallet import Wallet
 from app.schemas.wallet import WalletCreate, WalletResponse, WalletUpdate
+from app.services.health_cache import invalidate_health_cache
 
 router = APIRouter()
 
 # --- 1. GET ALL WALLETS ---
 @router.get("/", response_model=List[WalletResponse])
 async def read_wallets(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Ambil semua dompet aktif milik user yang sedang login.
     """
-    # Query hanya wallet milik user INI dan yang belum dihapus (Soft Delete Check)
+    # Query hanya wallet milik user INI dan yang belum dihapus (Soft Delete Check).
+    # Cuma kolom WalletResponse (urutan key sama), langsung dict -> orjson tanpa model Pydantic per baris.
     result = await db.execute(
-        select(Wallet).where(
+        select(Wallet.name, Wallet.type, Wallet.balance, Wallet.id, Wallet.user_id).where(
             Wallet.user_id == current_user.id,
             Wallet.deleted_at == None
         )
     )
-    return result.scalars().all()
+    return ORJSONResponse([row._asdict() for row in result])
 
 # --- 2. CREATE WALLET ---
 @router.post("/", response_model=WalletResponse)
@@ -43,11 +46,13 @@ async def create_wallet(
         name=wallet_in.name,
         type=wallet_in.type,
         balance=wallet_in.balance,
+        opening_balance=wallet_in.balance,
         user_id=current_user.id # Otomatis link ke user yang login
     )
     
     db.add(new_wallet)
     await db.commit()
+    invalidate_health_cache(current_user.id)
     await db.refresh(new_wallet)
     
     return new_wallet
@@ -87,6 +92,7 @@ async def delete_wallet(
         msg = "Dompet dipindahkan ke sampah (Soft Delete)"
     
     await db.commit()
+    invalidate_health_cache(current_user.id)
     return {"message": msg, "id": wallet_id}
 
 # --- 4. UPDATE WALLET ---
@@ -121,6 +127,7 @@ async def update_wallet(
 
     # 3. Simpan perubahan
     await db.commit()
+    invalidate_health_cache(current_user.id)
     await db.refresh(wallet)
 
     return wallet
\ No newline at end of file
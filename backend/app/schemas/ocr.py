@@ -0,0 +1,35 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+from enum import Enum
+
+class OCRJobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+class ReceiptData(BaseModel):
+    merchant: str
+    amount: int
+
+class OCRJobResponse(BaseModel):
+    job_id: str
+    status: OCRJobStatus
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    data: Optional[ReceiptData] = None # Terisi kalau status = done
+    error: Optional[str] = None        # Terisi kalau status = failed
+
+class BatchScanItem(BaseModel):
+    index: int                          # Urutan file di request
+    filename: Optional[str] = None
+    status: str                         # "success" / "error"
+    data: Optional[ReceiptData] = None
+    error: Optional[str] = None
+
+class BatchScanResponse(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    results: list[BatchScanItem]
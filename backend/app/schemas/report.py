@@ -0,0 +1,53 @@
+from pydantic import BaseModel
+from typing import Optional
+from decimal import Decimal
+from datetime import date
+
+class CategorySpending(BaseModel):
+    category_id: Optional[int] = None # None = tanpa kategori
+    name: str
+    total: Decimal
+    count: int
+    share: Decimal # Persen dari total periode
+
+class CategoryReport(BaseModel):
+    start: date
+    end: date
+    total: Decimal
+    items: list[CategorySpending]
+
+class CashflowPoint(BaseModel):
+    period: date # Awal bulan / awal minggu (Senin)
+    income: Decimal
+    expense: Decimal
+    net: Decimal
+    cumulative_net: Decimal # Running total net sejak awal range
+
+class CashflowReport(BaseModel):
+    start: date
+    end: date
+    period: str # month / week
+    items: list[CashflowPoint]
+
+class MerchantSpending(BaseModel):
+    rank: int
+    description: str
+    total: Decimal
+    count: int
+
+class MerchantReport(BaseModel):
+    start: date
+    end: date
+    items: list[MerchantSpending]
+
+class WalletFlow(BaseModel):
+    wallet_id: int
+    name: str
+    inflow: Decimal  # Income + transfer masuk
+    outflow: Decimal # Expense + transfer keluar
+    net: Decimal
+
+class WalletFlowReport(BaseModel):
+    start: date
+    end: date
+    items: list[WalletFlow]
@@ -45,4 +45,19 @@ class TransactionResponse(BaseModel):
     category: Optional[CategoryResponse] = None # Nested response biar keren
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# --- SCHEMAS PAGINATION (Keyset) ---
+class TransactionPage(BaseModel):
+    items: list[TransactionResponse]
+    next_cursor: Optional[str] = None # None = sudah halaman terakhir
+
+# --- SCHEMAS BULK IMPORT ---
+class ImportRowError(BaseModel):
+    row: int # Urutan baris data, mulai dari 1 (header CSV tidak dihitung)
+    detail: str
+
+class TransactionImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: list[ImportRowError] = []
@@ -0,0 +1,59 @@
+from typing import Iterable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.transaction import Category
+
+# Per-proses, key = user id, value = {category_id: dict field CategoryResponse}.
+# Kategori kecil & jarang berubah, jadi list kategori & list transaksi cukup baca dari sini.
+# Invalidasi cuma kena worker yang menerima write; worker lain ketinggalan maksimal
+# CATEGORY_CACHE_TTL_SECONDS (kecuali ketemu category_id yang belum dikenal -> langsung reload).
+# Dict di dalam cache dipakai bareng antar request: JANGAN diubah, cukup dibaca / di-serialize.
+_category_cache = TTLCache(maxsize=settings.CATEGORY_CACHE_MAX_USERS, ttl=settings.CATEGORY_CACHE_TTL_SECONDS)
+
+
+async def _load(db: AsyncSession, *where) -> dict[int, dict]:
+    result = await db.execute(
+        select(Category.id, Category.name, Category.type, Category.is_fixed).where(*where).order_by(Category.id)
+    )
+    # Urutan key = urutan field CategoryResponse, biar JSON-nya identik dengan response_model
+    return {row.id: {"name": row.name, "type": row.type, "is_fixed": row.is_fixed, "id": row.id} for row in result}
+
+
+async def get_user_categories(db: AsyncSession, user_id: int) -> dict[int, dict]:
+    """
+    Semua kategori milik user, key = category id. Sengaja TERMASUK yang di-soft delete (deleted_at
+    gak difilter): transaksi lama masih menunjuk ke kategori itu & tetap harus bisa ditampilkan.
+    """
+    categories = _category_cache.get(user_id)
+    if categories is None:
+        categories = await _load(db, Category.user_id == user_id)
+        _category_cache.set(user_id, categories)
+    return categories
+
+
+async def resolve_categories(db: AsyncSession, user_id: int, category_ids: Iterable[int]) -> dict[int, dict]:
+    """
+    Mapping kategori buat list transaksi. Biasanya 0 query (semua dari cache).
+    Ada id yang belum dikenal (kategori baru dari worker lain) -> reload cache user sekali;
+    masih belum ketemu (data lama yang nunjuk kategori user lain) -> ambil by id, tanpa di-cache.
+    """
+    categories = await get_user_categories(db, user_id)
+    missing = {cid for cid in category_ids if cid is not None and cid not in categories}
+    if not missing:
+        return categories
+
+    invalidate_category_cache(user_id)
+    categories = await get_user_categories(db, user_id)
+    missing -= categories.keys()
+    if missing:
+        categories = {**categories, **await _load(db, Category.id.in_(missing))}
+    return categories
+
+
+def invalidate_category_cache(user_id: int) -> None:
+    """Hook invalidasi: WAJIB dipanggil setelah commit yang menambah / mengubah / menghapus kategori user."""
+    _category_cache.pop(user_id)
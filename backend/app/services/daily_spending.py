@@ -0,0 +1,89 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.transaction import DailySpending, Transaction, TransactionType
+
+# (user_id, day, category_id, type) -> [total, jumlah transaksi]
+RollupKey = tuple[int, date, int, TransactionType]
+RollupDeltas = dict[RollupKey, list]
+
+
+def spending_day(value: datetime) -> date:
+    """Bucket harian = tanggal UTC (sama seperti cara timestamptz disimpan; naive dianggap UTC)."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+
+def add_rollup_delta(
+    deltas: RollupDeltas,
+    user_id: int,
+    trx_date: datetime,
+    category_id: Optional[int],
+    trx_type: TransactionType,
+    amount: Decimal,
+    count: int = 1,
+) -> RollupDeltas:
+    """
+    Catat perubahan 1 transaksi ke `deltas`.
+    Insert: amount & count positif. Hapus: amount negatif, count=-1. Edit: hapus yang lama + insert yang baru.
+    """
+    key = (user_id, spending_day(trx_date), category_id or 0, TransactionType(trx_type))
+    entry = deltas.setdefault(key, [Decimal(0), 0])
+    entry[0] += Decimal(amount)
+    entry[1] += count
+    return deltas
+
+
+async def apply_rollup_deltas(db: AsyncSession, deltas: RollupDeltas) -> None:
+    """
+    Upsert rollup (INSERT ... ON CONFLICT DO UPDATE total = total + delta).
+    Dipanggil SEBELUM commit di DB transaction yang sama dengan perubahan transaksinya,
+    jadi rollup gak pernah beda dengan tabel transactions.
+    """
+    rows = [
+        {"user_id": user_id, "day": day, "category_id": category_id, "type": trx_type, "total": total, "tx_count": count}
+        for (user_id, day, category_id, trx_type), (total, count) in deltas.items()
+        if total or count
+    ]
+    if not rows:
+        return
+
+    stmt = insert(DailySpending)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailySpending.user_id, DailySpending.day, DailySpending.category_id, DailySpending.type],
+        set_={
+            "total": DailySpending.total + stmt.excluded.total,
+            "tx_count": DailySpending.tx_count + stmt.excluded.tx_count,
+        },
+    )
+    # Key unik per baris (sudah diagregasi), jadi aman di-batch jadi 1 INSERT multi-VALUES
+    await db.execute(stmt, rows)
+
+
+async def rebuild_for_users(db: AsyncSession, user_ids: list[int]) -> int:
+    """
+    Hitung ulang rollup user-user ini dari tabel transactions (buat backfill / perbaikan).
+    Tidak commit, yang manggil yang commit. Return jumlah baris rollup yang ditulis.
+    """
+    await db.execute(delete(DailySpending).where(DailySpending.user_id.in_(user_ids)))
+
+    result = await db.stream(
+        select(Transaction.user_id, Transaction.date, Transaction.category_id, Transaction.type, Transaction.amount)
+        .where(Transaction.user_id.in_(user_ids), Transaction.deleted_at == None)
+        .execution_options(yield_per=5000)
+    )
+    deltas: RollupDeltas = {}
+    async for partition in result.partitions():
+        for user_id, trx_date, category_id, trx_type, amount in partition:
+            if trx_date is None: # Data lama tanpa tanggal, gak bisa masuk bucket harian
+                continue
+            add_rollup_delta(deltas, user_id, trx_date, category_id, trx_type, amount)
+
+    await apply_rollup_deltas(db, deltas)
+    return len(deltas)
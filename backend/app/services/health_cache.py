@@ -0,0 +1,36 @@
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.schemas.health import HealthCheckResponse
+
+# Per-proses, key = user id, value = (tanggal hitung, response).
+# Tiap worker uvicorn punya cache sendiri; invalidasi cuma kena worker yang menerima write,
+# worker lain ketinggalan maksimal HEALTH_CACHE_TTL_SECONDS.
+_health_cache = TTLCache(maxsize=settings.HEALTH_CACHE_MAX_USERS, ttl=settings.HEALTH_CACHE_TTL_SECONDS)
+
+
+def get_cached_health(user_id: int, today: date) -> Optional[HealthCheckResponse]:
+    cached = _health_cache.get(user_id)
+    if cached is None:
+        return None
+
+    computed_on, response = cached
+    # days_remaining & burn rate berubah tiap hari -> hasil kemarin gak berlaku
+    return response if computed_on == today else None
+
+
+def cache_health(user_id: int, now: datetime, response: HealthCheckResponse) -> None:
+    # Jangan sampai lewat tengah malam, meskipun TTL belum habis
+    midnight = datetime.combine(now.date() + timedelta(days=1), time.min, tzinfo=now.tzinfo)
+    ttl = min(settings.HEALTH_CACHE_TTL_SECONDS, (midnight - now).total_seconds())
+    _health_cache.set(user_id, (now.date(), response), ttl=ttl)
+
+
+def invalidate_health_cache(user_id: int) -> None:
+    """
+    Hook invalidasi: WAJIB dipanggil setelah commit apapun yang mengubah saldo wallet
+    atau transaksi user (create/update/delete wallet, create/import transaksi, dst).
+    """
+    _health_cache.pop(user_id)
@@ -2,40 +2,204 @@ import pytesseract
 from PIL import Image, ImageEnhance, ImageFilter
 import re
 import io
+import os
+import csv
 import platform
+import time
+from typing import Optional
 
 # --- KONFIGURASI TESSERACT ---
 if platform.system() == "Windows":
     # Pastikan path ini benar sesuai installan kamu
     pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
 
-def preprocess_image(image: Image.Image) -> Image.Image:
+# psm 6 = Assume single uniform block of text
+TESSERACT_CONFIG = r'--oem 3 --psm 6'
+TESSERACT_LANG = 'ind'
+# Pesan RuntimeError dari pytesseract kalau lewat batas `timeout`
+TESSERACT_TIMEOUT_MESSAGE = 'Tesseract process timeout'
+
+# Naikkan kalau preprocess/parsing berubah, supaya cache hasil OCR lama otomatis gak kepakai
+OCR_PIPELINE_VERSION = "2"
+
+# Format yang boleh di-decode PIL (decoder lain gak pernah disentuh input user)
+OCR_IMAGE_FORMATS = ("JPEG", "PNG")
+
+# --- KONFIGURASI PREPROCESS ---
+# Lebar struk 58-80mm @ ~450 DPI. Scan kecil dulu di-upscale 2x ke kisaran ini dan terbukti
+# bikin angka dot-matrix kebaca; lebih besar dari ini cuma bikin Tesseract lambat.
+OCR_TARGET_WIDTH = 1400
+OCR_MAX_UPSCALE = 2.0
+OCR_MAX_PIXELS = 6_000_000 # Batas total pixel setelah resize (struk panjang tetap aman)
+
+def _target_scale(width: int, height: int) -> float:
+    """
+    Hitung faktor resize supaya lebar struk mendekati OCR_TARGET_WIDTH.
+    - Scan kecil (dot-matrix) -> diperbesar (maks OCR_MAX_UPSCALE x).
+    - Foto HP 12-48 MP -> diperkecil, dan total pixel dibatasi OCR_MAX_PIXELS.
+    """
+    scale = min(OCR_TARGET_WIDTH / width, OCR_MAX_UPSCALE)
+
+    if (width * scale) * (height * scale) > OCR_MAX_PIXELS:
+        scale = (OCR_MAX_PIXELS / (width * height)) ** 0.5
+
+    return scale
+
+def preprocess_image(image: Image.Image, timings: Optional[dict] = None) -> Image.Image:
     """
     Membersihkan gambar agar lebih mudah dibaca Tesseract.
-    Update: Menambahkan UPSCALING biar angka '0' pada printer dot-matrix terbaca.
+    Update: Ukuran dinormalisasi ke lebar target (bukan selalu upscale 2x), jadi
+    angka '0' dot-matrix tetap kebaca tapi foto HP resolusi besar gak jadi raksasa.
+    timings: kalau diisi dict, durasi tiap tahap (detik) dicatat di situ.
     """
-    # 1. Upscale (Perbesar 2x) - KUNCI perbaikan angka hilang!
-    # Menggunakan LANCZOS supaya hasil resize tetap tajam
-    img = image.resize((image.width * 2, image.height * 2), Image.Resampling.LANCZOS)
-    
-    # 2. Grayscale
-    img = img.convert('L') 
+    clock = time.perf_counter()
+
+    def mark(stage: str):
+        nonlocal clock
+        now = time.perf_counter()
+        if timings is not None:
+            timings[stage] = now - clock
+        clock = now
+
+    # 1. Decode. Khusus JPEG: draft() = decoder langsung ngecilin (1/2, 1/4, 1/8) + grayscale,
+    # jadi foto 48 MP gak pernah di-decode full resolusi. Harus sebelum load().
+    scale = _target_scale(image.width, image.height)
+    if image.format == "JPEG" and scale < 1:
+        image.draft("L", (int(image.width * scale), int(image.height * scale)))
+    image.load()
+    mark("decode")
+
+    # 2. Grayscale DULUAN (1 channel = 1/3 memori & waktu resize dibanding RGB)
+    img = image.convert('L')
+    mark("grayscale")
+
+    # 3. Resize ke ukuran target (dihitung ulang karena draft() bisa sudah ngecilin)
+    scale = _target_scale(img.width, img.height)
+    if abs(scale - 1) > 0.05:
+        size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+        # LANCZOS supaya hasil resize tetap tajam; reducing_gap mempercepat downscale besar
+        img = img.resize(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+    mark("resize")
     
-    # 3. Contrast (Turunkan dikit jadi 1.5 biar gak washout)
+    # 4. Contrast (Turunkan dikit jadi 1.5 biar gak washout)
     enhancer = ImageEnhance.Contrast(img)
     img = enhancer.enhance(1.5) 
     
-    # 4. Sharpen
+    # 5. Sharpen
     img = img.filter(ImageFilter.SHARPEN)
+    mark("enhance")
     
     return img
 
+# --- MATCHER (Dikompilasi SEKALI saat import, bukan tiap parsing) ---
+
+MERCHANTS_FILE = os.path.join(os.path.dirname(__file__), "data", "merchants.csv")
+
+# Fallback merchant: baris yang mengandung kata ini bukan nama toko
+MERCHANT_BLACKLIST = [
+    "selamat", "welcome", "datang", "copy", "reprint", 
+    "jl.", "jalan", "raya", "telp", "phone", "fax", "npwp", 
+    "jakarta", "indonesia", "cabang", "outlet", "receipt",
+    "pt.", "ltd", "tbk", "invoice", "struk"
+]
+
+# Priority: Kalau ketemu ini, kemungkinan 99% ini angka yang benar (Net Price)
+TOTAL_PRIORITY_KEYWORDS = ["total belanja", "total bayar", "jumlah bayar", "tagihan", "harus dibayar"]
+
+# Target Umum: Kalau priority gak nemu, cari ini
+TOTAL_TARGET_KEYWORDS = ["total", "jumlah", "grand total", "amount", "harga jual", "netto", "bayar"]
+
+# Jebakan: Jangan ambil angka di baris ini
+# Update: Tambah 'disc' (Alfamart pakai titik 'Disc.'), 'hemat', 'kembalian'
+TOTAL_TRAP_KEYWORDS = [
+    "tunai", "cash", "kembali", "change", "hemat", 
+    "diskon", "discount", "disc", "potongan", 
+    "tax", "ppn", "pajak", "item", "qty", "dpp"
+]
+
+def _trie_pattern(words: list[str]) -> str:
+    """
+    Gabungkan banyak kata jadi SATU regex berbentuk trie, contoh:
+    ["alfamart", "alfamidi"] -> "alfam(?:art|idi)"
+    Cek di tiap posisi teks cuma sedalam panjang kata, bukan sebanyak jumlah kata,
+    jadi tetap cepat walau kamus berisi ribuan merchant.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True # Penanda akhir kata
+
+    def build(node: dict) -> str:
+        is_end = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not is_end:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if is_end else group
+
+    return build(trie)
+
+def _compile_keywords(words: list[str]) -> re.Pattern:
+    return re.compile(_trie_pattern(words))
+
+class MerchantMatcher:
+    """
+    Cari brand dari teks struk pakai satu regex trie.
+    Hasilnya sama dengan cek `keyword in text` satu-satu sesuai urutan kamus:
+    kalau ada beberapa keyword, yang prioritasnya paling tinggi (paling atas) yang menang.
+    """
+
+    def __init__(self, pairs: list[tuple[str, str]]):
+        self.priority: dict[str, tuple[int, str]] = {}
+        for index, (keyword, brand) in enumerate(pairs):
+            self.priority.setdefault(keyword.lower(), (index, brand))
+
+        self.max_len = max((len(keyword) for keyword in self.priority), default=0)
+        # Lookahead = cek di SETIAP posisi (termasuk keyword yang overlap)
+        self.pattern = re.compile("(?=(" + _trie_pattern(list(self.priority)) + "))") if self.priority else None
+
+    def find(self, text_lower: str) -> Optional[str]:
+        if self.pattern is None:
+            return None
+
+        best: Optional[tuple[int, str]] = None
+        for match in self.pattern.finditer(text_lower):
+            # Regex ambil yang terpanjang di posisi ini; keyword yang lebih pendek (prefix-nya) dicek juga
+            found = match.group(1)
+            for end in range(len(found), 0, -1):
+                entry = self.priority.get(found[:end])
+                if entry and (best is None or entry[0] < best[0]):
+                    best = entry
+            if best and best[0] == 0:
+                break
+
+        return best[1] if best else None
+
+def load_merchants(path: str = MERCHANTS_FILE) -> list[tuple[str, str]]:
+    """Baca kamus merchant (CSV: keyword,brand). Baris diawali '#' dianggap komentar."""
+    with open(path, encoding="utf-8") as f:
+        rows = csv.DictReader(line for line in f if line.strip() and not line.startswith("#"))
+        return [(row["keyword"].strip().lower(), row["brand"].strip()) for row in rows]
+
+_MERCHANT_MATCHER = MerchantMatcher(load_merchants())
+_BLACKLIST_RE = _compile_keywords(MERCHANT_BLACKLIST)
+_PRIORITY_RE = _compile_keywords(TOTAL_PRIORITY_KEYWORDS)
+_TARGET_RE = _compile_keywords(TOTAL_TARGET_KEYWORDS)
+_TRAP_RE = _compile_keywords(TOTAL_TRAP_KEYWORDS)
+_JUNK_LINE_RE = re.compile(r'^[\d\s\W]+$')
+_NUMBER_RE = re.compile(r'\d+[.,\d]*')
+_NON_DIGIT_RE = re.compile(r'[^\d]')
+
 def clean_currency(text: str) -> int:
     """
     Mengubah text angka (Rp 50.000, 50,000, 50000) menjadi integer.
     """
     # Hapus semua yg bukan angka
-    clean = re.sub(r'[^\d]', '', text)
+    clean = _NON_DIGIT_RE.sub('', text)
     if not clean:
         return 0
     return int(clean)
@@ -44,63 +208,18 @@ def parse_merchant(text_full: str, lines: list[str]) -> str:
     """
     Mencari nama merchant dengan Database Brand + Nama PT.
     """
-    text_lower = text_full.lower()
-    
-    # 1. DATABASE BRAND (Mapping Pintar)
-    # Kiri: Kata kunci yg mungkin muncul di struk (misal nama PT)
-    # Kanan: Nama Brand yang kita mau tampilkan
-    brand_map = {
-        "indomaret": "INDOMARET",
-        "indomarco": "INDOMARET", # Kalau yg kebaca PT Indomarco
-        "alfamart": "ALFAMART",
-        "sumber alfaria": "ALFAMART", # Nama PT Alfamart
-        "alfamidi": "ALFAMIDI",
-        "midi utama": "ALFAMIDI",
-        "pertamina": "PERTAMINA",
-        "shell": "SHELL",
-        "starbucks": "STARBUCKS",
-        "mcdonald": "MCDONALD'S",
-        "kfc": "KFC",
-        "burger king": "BURGER KING",
-        "gofood": "GOFOOD",
-        "grabfood": "GRABFOOD",
-        "shopeefood": "SHOPEEFOOD",
-        "solaria": "SOLARIA",
-        "chatime": "CHATIME",
-        "janji jiwa": "JANJI JIWA",
-        "kopi kenangan": "KOPI KENANGAN",
-        "lawson": "LAWSON",
-        "superindo": "SUPERINDO",
-        "hypermart": "HYPERMART",
-        "familymart": "FAMILYMART"
-    }
-
-    # Cek apakah ada keyword PT atau Brand di seluruh teks
-    for keyword, brand_name in brand_map.items():
-        if keyword in text_lower:
-            return brand_name
+    # 1. DATABASE BRAND: Cek apakah ada keyword PT atau Brand di seluruh teks
+    brand_name = _MERCHANT_MATCHER.find(text_full.lower())
+    if brand_name:
+        return brand_name
 
     # 2. FALLBACK: Cari di 5 baris teratas
-    blacklist = [
-        "selamat", "welcome", "datang", "copy", "reprint", 
-        "jl.", "jalan", "raya", "telp", "phone", "fax", "npwp", 
-        "jakarta", "indonesia", "cabang", "outlet", "receipt",
-        "pt.", "ltd", "tbk", "invoice", "struk"
-    ]
-    
     for line in lines[:5]:
         clean = line.strip()
-        lower_line = clean.lower()
         
         # Filter sampah
-        if len(clean) > 3 and not re.match(r'^[\d\s\W]+$', clean):
-            is_blacklisted = False
-            for bad in blacklist:
-                if bad in lower_line:
-                    is_blacklisted = True
-                    break
-            
-            if not is_blacklisted:
+        if len(clean) > 3 and not _JUNK_LINE_RE.match(clean):
+            if not _BLACKLIST_RE.search(clean.lower()):
                 return clean.upper()
                 
     return "UNKNOWN MERCHANT"
@@ -112,55 +231,30 @@ def parse_total(lines: list[str]) -> int:
        Jika ketemu, langsung return (karena ini pasti nilai Net setelah diskon).
     2. FALLBACK: Cari kata 'Total' biasa, lalu filter jebakan, dan ambil nilai MAX.
     """
-    
-    # 1. KEYWORDS
-    # Priority: Kalau ketemu ini, kemungkinan 99% ini angka yang benar (Net Price)
-    priority_keywords = ["total belanja", "total bayar", "jumlah bayar", "tagihan", "harus dibayar"]
-    
-    # Target Umum: Kalau priority gak nemu, cari ini
-    target_keywords = ["total", "jumlah", "grand total", "amount", "harga jual", "netto", "bayar"]
-    
-    # Jebakan: Jangan ambil angka di baris ini
-    # Update: Tambah 'disc' (Alfamart pakai titik 'Disc.'), 'hemat', 'kembalian'
-    trap_keywords = [
-        "tunai", "cash", "kembali", "change", "hemat", 
-        "diskon", "discount", "disc", "potongan", 
-        "tax", "ppn", "pajak", "item", "qty", "dpp"
-    ]
-
-    # 2. STRATEGI 1: CEK PRIORITAS (Alfamart/Indomaret Net Price)
-    for line in lines:
-        lower_line = line.lower()
-        
+    lower_lines = [line.lower() for line in lines]
+
+    # STRATEGI 1: CEK PRIORITAS (Alfamart/Indomaret Net Price)
+    for line, lower_line in zip(lines, lower_lines):
         # Cek apakah baris mengandung keyword prioritas "Total Belanja"
-        if any(prio in lower_line for prio in priority_keywords):
+        if _PRIORITY_RE.search(lower_line):
             
             # Tetap waspada, jangan sampai ambil baris "Kembalian" walau ada kata "Bayar"
-            if any(trap in lower_line for trap in trap_keywords):
-                if "kembali" in lower_line: # Double check khusus kata 'kembali' yang fatal
-                    continue
-
-            matches = re.findall(r'\d+[.,\d]*', line)
-            if matches:
-                # Ambil angka terakhir di baris itu (biasanya posisi nominal ada di kanan)
-                for match in reversed(matches):
-                    val = clean_currency(match)
-                    if 100 < val < 50000000:
-                        return val # <--- LANGSUNG RETURN, GAK USAH CARI MAX LAGI
-
-    # 3. STRATEGI 2: FALLBACK (Logika Lama - Cari Max)
+            if "kembali" in lower_line:
+                continue
+
+            # Ambil angka terakhir di baris itu (biasanya posisi nominal ada di kanan)
+            for match in reversed(_NUMBER_RE.findall(line)):
+                val = clean_currency(match)
+                if 100 < val < 50000000:
+                    return val # <--- LANGSUNG RETURN, GAK USAH CARI MAX LAGI
+
+    # STRATEGI 2: FALLBACK (Logika Lama - Cari Max)
     # Dipakai kalau struknya gak standar atau keyword "Total Belanja" gak kebaca
     candidates = []
-    for line in lines:
-        lower_line = line.lower()
-        
-        if any(target in lower_line for target in target_keywords):
-            # Cek Jebakan
-            if any(trap in lower_line for trap in trap_keywords):
-                continue
-            
-            matches = re.findall(r'\d+[.,\d]*', line)
-            for match in matches:
+    for line, lower_line in zip(lines, lower_lines):
+        # Cek target & Jebakan
+        if _TARGET_RE.search(lower_line) and not _TRAP_RE.search(lower_line):
+            for match in _NUMBER_RE.findall(line):
                 val = clean_currency(match)
                 if 100 < val < 50000000:
                     candidates.append(val)
@@ -171,31 +265,49 @@ def parse_total(lines: list[str]) -> int:
         
     return 0
 
-async def extract_receipt_data(image_bytes: bytes):
+def extract_receipt_data(image_bytes: bytes, timeout: float = 0):
+    """
+    Pipeline OCR lengkap (CPU-bound & blocking!).
+    Jangan dipanggil langsung dari endpoint async, lewat `ocr_engine` (app/services/ocr_engine.py)
+    supaya jalan di process pool dan gak nge-freeze event loop.
+    timeout: batas detik buat proses Tesseract (0 = tanpa batas).
+    """
+    timings: dict = {}
     try:
-        image = Image.open(io.BytesIO(image_bytes))
+        image = Image.open(io.BytesIO(image_bytes), formats=OCR_IMAGE_FORMATS)
         
         # STEP 1: Preprocess (Resize & Contrast)
-        processed_image = preprocess_image(image)
+        processed_image = preprocess_image(image, timings=timings)
         
         # STEP 2: OCR
-        # psm 6 = Assume single uniform block of text
-        custom_config = r'--oem 3 --psm 6' 
-        text_full = pytesseract.image_to_string(processed_image, config=custom_config, lang='ind')
+        clock = time.perf_counter()
+        text_full = pytesseract.image_to_string(processed_image, config=TESSERACT_CONFIG, lang=TESSERACT_LANG, timeout=timeout)
+        timings["ocr"] = time.perf_counter() - clock
         
         lines = [line for line in text_full.split('\n') if line.strip()]
         
         # STEP 3: Parsing Data
+        clock = time.perf_counter()
         merchant = parse_merchant(text_full, lines)
         amount = parse_total(lines)
+        timings["parse"] = time.perf_counter() - clock
 
         return {
             "merchant": merchant,
             "amount": amount,
+            "timings": timings, # Detik per tahap, dicatat ke metrics oleh ocr_engine (gak ikut di-cache)
             # Kita return raw_text juga kalau mau debug
             # "raw_text": lines 
         }
 
+    except RuntimeError as e:
+        print(f"OCR Error: {e}")
+        # pytesseract kasih RuntimeError("Tesseract process timeout") kalau lewat `timeout`:
+        # ditandai biar ocr_engine bisa jawab 504, bukan error biasa
+        if str(e) == TESSERACT_TIMEOUT_MESSAGE:
+            return {"merchant": "", "amount": 0, "error": str(e), "timed_out": True}
+        return {"merchant": "", "amount": 0, "error": str(e)}
+
     except Exception as e:
         print(f"OCR Error: {e}")
-        return {"merchant": "", "amount": 0, "error": str(e)}
\ No newline at end of file
+        return {"merchant": "", "amount": 0, "error": str(e)}
@@ -0,0 +1,144 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import Optional
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.services.ocr import TESSERACT_CONFIG, TESSERACT_LANG, OCR_PIPELINE_VERSION
+
+
+class OCRResultCache:
+    """
+    Cache hasil extract_receipt_data, key = SHA-256 dari isi gambar + config OCR.
+    Foto struk yang sama di-upload ulang (gagal simpan / beda device) gak perlu OCR lagi.
+
+    Tier 1: memori (LRU, batas jumlah item + TTL).
+    Tier 2 (opsional): file JSON di disk, dibatasi total ukuran (yang paling lama gak dipakai dibuang).
+    """
+
+    def __init__(self, max_items: int, ttl: int, disk_dir: Optional[str] = None, disk_max_bytes: int = 0):
+        self.ttl = ttl
+        self.memory = TTLCache(maxsize=max_items, ttl=ttl)
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._disk_bytes: Optional[int] = None # Dihitung saat pertama kali nulis
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(image_bytes: bytes) -> str:
+        digest = hashlib.sha256()
+        digest.update(f"{OCR_PIPELINE_VERSION}|{TESSERACT_LANG}|{TESSERACT_CONFIG}|".encode())
+        digest.update(image_bytes)
+        return digest.hexdigest()
+
+    async def get(self, key: str) -> Optional[dict]:
+        result = self.memory.get(key)
+        if result is not None:
+            self.memory_hits += 1
+            return result
+
+        if self.disk_dir:
+            result = await asyncio.to_thread(self._read_disk, key)
+            if result is not None:
+                self.disk_hits += 1
+                self.memory.set(key, result) # Promote ke memori
+                return result
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, result: dict) -> None:
+        self.memory.set(key, result)
+        if self.disk_dir:
+            await asyncio.to_thread(self._write_disk, key, result)
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "memory_items": len(self.memory),
+            "disk_enabled": bool(self.disk_dir),
+        }
+
+    # --- Disk tier ---
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _entries(self) -> list:
+        # Cuma file hasil (.json); file .tmp bisa jadi lagi ditulis thread lain / sisa crash
+        return [entry for entry in os.scandir(self.disk_dir) if entry.name.endswith(".json")]
+
+    def _read_disk(self, key: str) -> Optional[dict]:
+        path = self._path(key)
+        try:
+            if os.path.getmtime(path) + self.ttl < time.time():
+                size = os.path.getsize(path)
+                os.remove(path)
+                if self._disk_bytes is not None:
+                    self._disk_bytes -= size
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+            os.utime(path) # Tandai baru dipakai (buat urutan eviction)
+            return result
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key: str, result: dict) -> None:
+        # Disk tier cuma best-effort: disk penuh / permission error gak boleh bikin request OCR gagal
+        try:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(entry.stat().st_size for entry in self._entries())
+
+            path = self._path(key)
+            tmp_path = f"{path}.tmp"
+            try:
+                old_size = os.path.getsize(path) # Key yang sama ditulis ulang -> ukuran lama gak dihitung dobel
+            except OSError:
+                old_size = 0
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(result, f)
+            os.replace(tmp_path, path) # Atomic, reader gak pernah lihat file setengah jadi
+            self._disk_bytes += os.path.getsize(path) - old_size
+
+            if self._disk_bytes > self.disk_max_bytes:
+                self._evict_disk()
+        except OSError as e:
+            print(f"OCR Cache Error: {e}")
+
+    def _evict_disk(self) -> None:
+        # Buang file yang paling lama gak dipakai sampai sisa 90% dari batas
+        entries = sorted(self._entries(), key=lambda entry: entry.stat().st_mtime)
+        total = sum(entry.stat().st_size for entry in entries)
+        target = int(self.disk_max_bytes * 0.9)
+
+        for entry in entries:
+            if total <= target:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                total -= size
+            except OSError:
+                pass
+
+        self._disk_bytes = total
+
+ocr_cache = OCRResultCache(
+    max_items=settings.OCR_CACHE_MAX_ITEMS,
+    ttl=settings.OCR_CACHE_TTL_SECONDS,
+    disk_dir=settings.OCR_CACHE_DIR,
+    disk_max_bytes=settings.OCR_CACHE_DISK_MAX_MB * 1024 * 1024,
+)
@@ -0,0 +1,114 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from app.core.config import settings
+from app.core.metrics import OCR_STAGE
+from app.services.ocr import extract_receipt_data
+from app.services.ocr_cache import ocr_cache, OCRResultCache
+
+
+class OCRBusyError(Exception):
+    """Antrian OCR penuh. Client disuruh coba lagi nanti (503)."""
+
+
+class OCRTimeoutError(Exception):
+    """Job OCR lewat dari batas waktu (504)."""
+
+
+class OCREngine:
+    """
+    Eksekutor OCR berbasis ProcessPoolExecutor.
+    - PIL + Tesseract jalan di proses terpisah, event loop API tetap lancar.
+    - Maksimal `workers` job jalan bareng + `max_queue` job antri. Lebih dari itu -> OCRBusyError.
+    - Tiap job dibatasi `timeout` detik sejak dipegang worker (waktu antri gak dihitung),
+      Tesseract-nya juga di-kill di worker.
+    - Kalau ada `cache`, gambar yang identik langsung dijawab dari cache tanpa OCR ulang.
+    """
+
+    def __init__(self, workers: int, max_queue: int, timeout: float, cache: Optional[OCRResultCache] = None):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.cache = cache
+        self.in_flight = 0 # Job yang antri + yang benar-benar jalan di worker
+        self._slots = asyncio.Semaphore(workers) # Job baru dikirim ke pool kalau ada worker kosong
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # Dibuat saat pertama dipakai, biar import modul ini gak langsung spawn proses
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def _release(self, future: asyncio.Future) -> None:
+        # Dipanggil saat job di worker BENAR-BENAR selesai (termasuk yang sudah timeout di sisi kita),
+        # jadi slot & hitungan backpressure gak lepas selama worker masih sibuk
+        self._slots.release()
+        self.in_flight -= 1
+        if not future.cancelled():
+            future.exception() # Tandai sudah diambil, biar gak ada warning "exception never retrieved"
+
+    async def run(self, image_bytes: bytes) -> dict:
+        # Cache dicek duluan: hit gak makan slot worker, jadi gak pernah kena 503
+        cache_key = None
+        if self.cache is not None:
+            cache_key = await asyncio.to_thread(self.cache.make_key, image_bytes)
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                return dict(cached)
+
+        if self.in_flight >= self.workers + self.max_queue:
+            raise OCRBusyError()
+
+        self.in_flight += 1
+        try:
+            await self._slots.acquire() # Antri worker kosong; timeout belum dihitung di sini
+        except BaseException:
+            self.in_flight -= 1
+            raise
+
+        try:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._get_pool(), extract_receipt_data, image_bytes, self.timeout)
+        except BaseException:
+            self._slots.release()
+            self.in_flight -= 1
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            # Timeout dihitung sejak job dipegang worker. shield: kalau timeout / request batal,
+            # future tetap jalan sampai worker selesai (Tesseract-nya di-kill di worker)
+            result = await asyncio.wait_for(asyncio.shield(future), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise OCRTimeoutError()
+        except BrokenProcessPool as e:
+            # Worker mati mendadak (OOM / crash) -> bikin pool baru buat job berikutnya
+            print(f"OCR Error: {e}")
+            self._pool = None
+            return {"merchant": "", "amount": 0, "error": str(e)}
+
+        if result.pop("timed_out", False): # Tesseract di worker kena timeout
+            raise OCRTimeoutError()
+
+        for stage, seconds in result.pop("timings", {}).items():
+            OCR_STAGE.observe(seconds, (stage,))
+
+        if cache_key is not None and not result.get("error"):
+            await self.cache.set(cache_key, result)
+        return result
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+ocr_engine = OCREngine(
+    workers=settings.OCR_WORKERS,
+    max_queue=settings.OCR_MAX_QUEUE,
+    timeout=settings.OCR_JOB_TIMEOUT_SECONDS,
+    cache=ocr_cache,
+)
@@ -0,0 +1,146 @@
+import asyncio
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from app.core.config import settings
+from app.schemas.ocr import OCRJobStatus
+from app.services.ocr_engine import ocr_engine, OCREngine, OCRBusyError, OCRTimeoutError
+
+
+@dataclass
+class OCRJob:
+    id: str
+    status: OCRJobStatus = OCRJobStatus.QUEUED
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: Optional[datetime] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+
+
+class InMemoryOCRJobStore:
+    """
+    Penyimpanan job di memori proses (hilang kalau server restart).
+    Interface-nya sengaja minimal (get/save/delete/all) supaya gampang diganti
+    store persisten (Redis / tabel DB) tanpa mengubah OCRJobManager.
+    """
+
+    def __init__(self):
+        self._jobs: dict[str, OCRJob] = {}
+
+    async def get(self, job_id: str) -> Optional[OCRJob]:
+        return self._jobs.get(job_id)
+
+    async def save(self, job: OCRJob) -> None:
+        self._jobs[job.id] = job
+
+    async def delete(self, job_id: str) -> None:
+        self._jobs.pop(job_id, None)
+
+    async def all(self) -> list[OCRJob]:
+        return list(self._jobs.values())
+
+
+class OCRJobManager:
+    """
+    Submit gambar -> langsung dapat job id, OCR jalan di background lewat OCREngine.
+    Status: queued -> running -> done / failed. Job yang sudah selesai dihapus
+    setelah `retention` detik.
+    """
+
+    def __init__(self, engine: OCREngine, store: InMemoryOCRJobStore, retention: int):
+        self.engine = engine
+        self.store = store
+        self.retention = timedelta(seconds=retention)
+        self._slots = asyncio.Semaphore(engine.workers)
+        self._pending = 0
+        self._finished: dict[str, asyncio.Event] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, image_bytes: bytes) -> OCRJob:
+        await self.purge_expired()
+
+        # Backpressure: kapasitas sama dengan engine (worker + antrian)
+        if self._pending >= self.engine.workers + self.engine.max_queue:
+            raise OCRBusyError()
+
+        job = OCRJob(id=uuid.uuid4().hex)
+        await self.store.save(job)
+        self._finished[job.id] = asyncio.Event()
+
+        self._pending += 1
+        task = asyncio.create_task(self._execute(job, image_bytes))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _execute(self, job: OCRJob, image_bytes: bytes) -> None:
+        try:
+            async with self._slots:
+                job.status = OCRJobStatus.RUNNING
+                await self.store.save(job)
+
+                error = None
+                try:
+                    result = await self.engine.run(image_bytes)
+                    if result.get("error"):
+                        error = "Gagal memproses gambar" # Detail error teknis cukup di log
+                except OCRBusyError:
+                    error = "Server OCR lagi sibuk, coba lagi sebentar ya."
+                except OCRTimeoutError:
+                    error = "Proses scan kelamaan, coba foto yang lebih jelas"
+
+            if error:
+                job.status = OCRJobStatus.FAILED
+                job.error = error
+            else:
+                job.status = OCRJobStatus.DONE
+                job.result = result
+        finally:
+            # Tetap ditandai selesai walau task di-cancel (shutdown) biar long-poll gak nyangkut
+            if job.status not in (OCRJobStatus.DONE, OCRJobStatus.FAILED):
+                job.status = OCRJobStatus.FAILED
+                job.error = "Job dibatalkan"
+            job.finished_at = datetime.now(timezone.utc)
+            self._pending -= 1
+            await self.store.save(job)
+            event = self._finished.get(job.id)
+            if event:
+                event.set()
+
+    async def get(self, job_id: str, wait: float = 0) -> Optional[OCRJob]:
+        """Ambil status job. wait > 0 = long-poll: tunggu sampai selesai (maks `wait` detik)."""
+        job = await self.store.get(job_id)
+        if job is None or self._is_expired(job):
+            return None
+
+        event = self._finished.get(job_id)
+        if wait > 0 and event is not None and not event.is_set():
+            try:
+                await asyncio.wait_for(event.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+            job = await self.store.get(job_id)
+
+        return job
+
+    def _is_expired(self, job: OCRJob) -> bool:
+        return job.finished_at is not None and job.finished_at + self.retention < datetime.now(timezone.utc)
+
+    async def purge_expired(self) -> None:
+        for job in await self.store.all():
+            if self._is_expired(job):
+                await self.store.delete(job.id)
+                self._finished.pop(job.id, None)
+
+    def shutdown(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+
+
+ocr_jobs = OCRJobManager(
+    engine=ocr_engine,
+    store=InMemoryOCRJobStore(),
+    retention=settings.OCR_JOB_RETENTION_SECONDS,
+)
@@ -0,0 +1,171 @@
+import csv
+import io
+from collections import defaultdict
+from decimal import Decimal
+
+from pydantic import ValidationError
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.wallet import Wallet
+from app.models.transaction import Transaction, TransactionType, Category
+from app.schemas.transaction import TransactionCreate, TransactionImportResult, ImportRowError
+from app.services.daily_spending import add_rollup_delta, apply_rollup_deltas
+from app.services.health_cache import invalidate_health_cache
+
+# Batas baris per request biar 1 transaksi DB gak kelamaan nge-lock wallet
+MAX_IMPORT_ROWS = 5000
+
+# Kolom CSV yang dikenali (sama dengan field TransactionCreate)
+CSV_COLUMNS = ["wallet_id", "amount", "type", "date", "description", "category_id", "target_wallet_id"]
+
+
+def _format_validation_error(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+    )
+
+
+def parse_csv_rows(content: bytes) -> list[dict]:
+    """
+    Ubah isi file CSV (dengan header) jadi list of dict.
+    Cell kosong dianggap None (supaya field Optional tidak gagal validasi).
+    """
+    text = content.decode("utf-8-sig") # utf-8-sig: buang BOM dari export Excel
+    reader = csv.DictReader(io.StringIO(text))
+
+    rows = []
+    for record in reader:
+        rows.append({
+            key.strip(): (value.strip() or None) if isinstance(value, str) else value
+            for key, value in record.items()
+            if key and key.strip() in CSV_COLUMNS
+        })
+    return rows
+
+
+async def import_transactions(rows: list[dict], user_id: int, db: AsyncSession) -> TransactionImportResult:
+    """
+    Bulk import transaksi dalam SATU transaksi DB:
+    1. Validasi tiap baris (schema + aturan yang sama dengan create_transaction).
+    2. Ambil & lock semua wallet yang disebut sekaligus (1 query).
+    3. Saldo disimulasikan berurutan, baris yang gagal dilaporkan & di-skip.
+    4. Delta saldo di-apply per wallet (1 UPDATE per wallet, bukan per baris).
+    5. Semua baris valid ditulis pakai multi-row INSERT.
+    """
+    errors: list[ImportRowError] = []
+    parsed: list[tuple[int, TransactionCreate]] = []
+
+    # 1. Validasi schema per baris
+    for row_no, raw in enumerate(rows, start=1):
+        try:
+            trx_in = TransactionCreate.model_validate(raw)
+        except ValidationError as e:
+            errors.append(ImportRowError(row=row_no, detail=_format_validation_error(e)))
+            continue
+
+        # Safety Check yang sama dengan create_transaction
+        if trx_in.type != TransactionType.TRANSFER or trx_in.target_wallet_id == 0:
+            trx_in.target_wallet_id = None
+
+        if trx_in.amount <= 0:
+            errors.append(ImportRowError(row=row_no, detail="Nominal harus lebih dari 0"))
+            continue
+
+        parsed.append((row_no, trx_in))
+
+    # 2. Ambil wallet & kategori milik user yang direferensikan (sekali query, bukan per baris)
+    wallet_ids = {trx.wallet_id for _, trx in parsed} | {
+        trx.target_wallet_id for _, trx in parsed if trx.target_wallet_id
+    }
+    category_ids = {trx.category_id for _, trx in parsed if trx.category_id}
+
+    wallet_res = await db.execute(
+        select(Wallet.id, Wallet.balance)
+        .where(Wallet.id.in_(wallet_ids), Wallet.user_id == user_id)
+        .order_by(Wallet.id) # Urutan lock sama dengan create_transaction (urut id), biar gak deadlock
+        .with_for_update() # Lock biar simulasi saldo gak balapan sama request lain
+    )
+    balances = {wallet_id: balance or Decimal(0) for wallet_id, balance in wallet_res.all()}
+
+    owned_categories = set()
+    if category_ids:
+        cat_res = await db.execute(
+            select(Category.id).where(Category.id.in_(category_ids), Category.user_id == user_id)
+        )
+        owned_categories = set(cat_res.scalars().all())
+
+    # 3. Simulasi saldo berurutan
+    deltas: dict[int, Decimal] = defaultdict(Decimal)
+    values = []
+
+    for row_no, trx_in in parsed:
+        if trx_in.wallet_id not in balances:
+            errors.append(ImportRowError(row=row_no, detail="Dompet sumber tidak ditemukan"))
+            continue
+
+        if trx_in.category_id and trx_in.category_id not in owned_categories:
+            errors.append(ImportRowError(row=row_no, detail="Kategori tidak ditemukan"))
+            continue
+
+        if trx_in.type == TransactionType.INCOME:
+            balances[trx_in.wallet_id] += trx_in.amount
+            deltas[trx_in.wallet_id] += trx_in.amount
+
+        elif trx_in.type == TransactionType.EXPENSE:
+            if balances[trx_in.wallet_id] < trx_in.amount:
+                errors.append(ImportRowError(row=row_no, detail="Saldo tidak cukup bro!"))
+                continue
+            balances[trx_in.wallet_id] -= trx_in.amount
+            deltas[trx_in.wallet_id] -= trx_in.amount
+
+        elif trx_in.type == TransactionType.TRANSFER:
+            if not trx_in.target_wallet_id:
+                errors.append(ImportRowError(row=row_no, detail="Target wallet wajib untuk transfer"))
+                continue
+            if trx_in.target_wallet_id not in balances:
+                errors.append(ImportRowError(row=row_no, detail="Dompet tujuan tidak ditemukan"))
+                continue
+            if balances[trx_in.wallet_id] < trx_in.amount:
+                errors.append(ImportRowError(row=row_no, detail="Saldo kurang untuk transfer"))
+                continue
+            balances[trx_in.wallet_id] -= trx_in.amount
+            balances[trx_in.target_wallet_id] += trx_in.amount
+            deltas[trx_in.wallet_id] -= trx_in.amount
+            deltas[trx_in.target_wallet_id] += trx_in.amount
+
+        values.append({
+            "user_id": user_id,
+            "wallet_id": trx_in.wallet_id,
+            "category_id": trx_in.category_id,
+            "target_wallet_id": trx_in.target_wallet_id,
+            "type": TransactionType(trx_in.type.value),
+            "amount": trx_in.amount,
+            "date": trx_in.date,
+            "description": trx_in.description,
+        })
+
+    # 4 & 5. Tulis semuanya dalam satu transaksi
+    if values:
+        for wallet_id, delta in deltas.items():
+            if delta:
+                await db.execute(
+                    update(Wallet).where(Wallet.id == wallet_id).values(balance=Wallet.balance + delta)
+                )
+
+        # executemany -> SQLAlchemy "insertmanyvalues" jadi INSERT ... VALUES (...), (...), ...
+        await db.execute(insert(Transaction), values)
+
+        # Rollup harian: diagregasi dulu per (hari, kategori, tipe) -> 1 upsert per bucket
+        rollup = {}
+        for row in values:
+            add_rollup_delta(rollup, user_id, row["date"], row["category_id"], row["type"], row["amount"])
+        await apply_rollup_deltas(db, rollup)
+
+    await db.commit()
+    if values:
+        invalidate_health_cache(user_id)
+
+    errors.sort(key=lambda e: e.row)
+    return TransactionImportResult(imported=len(values), failed=len(errors), errors=errors)
@@ -0,0 +1,106 @@
+from dataclasses import dataclass
+from decimal import Decimal
+
+from sqlalchemy import case, literal, union_all, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.sql import func
+
+from app.models.wallet import Wallet
+from app.models.transaction import Transaction, TransactionType
+
+
+@dataclass
+class WalletDiscrepancy:
+    wallet_id: int
+    user_id: int
+    balance: Decimal  # Saldo tersimpan
+    expected: Decimal # opening_balance + net transaksi
+
+
+@dataclass
+class BatchResult:
+    users: int
+    wallets: int
+    transactions: int
+    discrepancies: list[WalletDiscrepancy]
+    repaired: int = 0
+
+
+def _wallet_net(wallet_filter):
+    """
+    Subquery net per wallet: INCOME +, EXPENSE & TRANSFER keluar -, TRANSFER masuk (target_wallet_id) +.
+    Transaksi yang di-soft delete tidak dihitung.
+    """
+    legs = union_all(
+        select(
+            Transaction.wallet_id.label("wallet_id"),
+            case((Transaction.type == TransactionType.INCOME, Transaction.amount), else_=-Transaction.amount).label("delta"),
+            literal(1).label("rows"),
+        ).where(Transaction.deleted_at == None, Transaction.wallet_id.in_(wallet_filter)),
+        select(
+            Transaction.target_wallet_id,
+            Transaction.amount,
+            literal(0), # Baris transfer yang sama, jangan dihitung 2x di statistik
+        ).where(
+            Transaction.deleted_at == None,
+            Transaction.type == TransactionType.TRANSFER,
+            Transaction.target_wallet_id.in_(wallet_filter),
+        ),
+    ).subquery()
+
+    return (
+        select(legs.c.wallet_id, func.sum(legs.c.delta).label("net"), func.sum(legs.c.rows).label("rows"))
+        .group_by(legs.c.wallet_id)
+        .subquery()
+    )
+
+
+async def check_users(db: AsyncSession, user_ids: list[int]) -> BatchResult:
+    """
+    Bandingkan saldo tersimpan vs hasil hitung ulang untuk semua wallet milik `user_ids` (1 query).
+    Transaksi diagregasi di DB; yang balik ke Python cuma 1 baris per wallet, jadi memori
+    tergantung ukuran batch user, bukan jumlah transaksi.
+    """
+    net = _wallet_net(select(Wallet.id).where(Wallet.user_id.in_(user_ids)))
+    rows = (await db.execute(
+        select(
+            Wallet.id,
+            Wallet.user_id,
+            func.coalesce(Wallet.balance, 0).label("balance"),
+            (Wallet.opening_balance + func.coalesce(net.c.net, 0)).label("expected"),
+            func.coalesce(net.c.rows, 0).label("rows"),
+        )
+        .outerjoin(net, net.c.wallet_id == Wallet.id)
+        .where(Wallet.user_id.in_(user_ids))
+    )).all()
+
+    return BatchResult(
+        users=len(user_ids),
+        wallets=len(rows),
+        transactions=sum(int(row.rows) for row in rows),
+        discrepancies=[
+            WalletDiscrepancy(wallet_id=row.id, user_id=row.user_id, balance=Decimal(row.balance), expected=Decimal(row.expected))
+            for row in rows if Decimal(row.balance) != Decimal(row.expected)
+        ],
+    )
+
+
+async def repair_wallets(db: AsyncSession, wallet_ids: list[int]) -> int:
+    """
+    Set balance = opening_balance + net transaksi. Tidak commit.
+    Row wallet di-lock (FOR UPDATE) DULU, baru net dihitung di statement berikutnya: create_transaction
+    yang sedang jalan pegang lock row yang sama, jadi transaksinya pasti sudah commit & ikut terhitung.
+    """
+    await db.execute(select(Wallet.id).where(Wallet.id.in_(wallet_ids)).with_for_update())
+
+    net = _wallet_net(wallet_ids)
+    result = await db.execute(
+        update(Wallet)
+        .where(Wallet.id.in_(wallet_ids))
+        .values(balance=Wallet.opening_balance + func.coalesce(
+            select(net.c.net).where(net.c.wallet_id == Wallet.id).scalar_subquery(), 0
+        ))
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
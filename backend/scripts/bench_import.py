@@ -0,0 +1,84 @@
+"""
+Bandingkan throughput bulk import vs create_transaction satu-satu.
+
+Cara pakai (dari folder backend, DB sudah di-migrate):
+    python -m scripts.bench_import --rows 2000
+
+Data benchmark (user, wallet, transaksi) dihapus lagi di akhir.
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import delete
+
+from app.core.database import engine, SessionLocal
+from app.models.user import User
+from app.models.wallet import Wallet
+from app.models.transaction import Transaction, DailySpending
+from app.routers.transactions import create_transaction
+from app.schemas.transaction import TransactionCreate
+from app.services.transaction_import import import_transactions
+
+
+def make_rows(wallet_id: int, count: int) -> list[dict]:
+    start = datetime.now().astimezone() - timedelta(days=count)
+    return [
+        {
+            "wallet_id": wallet_id,
+            "amount": "1000" if i % 3 == 0 else "250",
+            "type": "INCOME" if i % 3 == 0 else "EXPENSE",
+            "date": (start + timedelta(days=i)).isoformat(),
+            "description": f"bench #{i}",
+        }
+        for i in range(count)
+    ]
+
+
+async def main(count: int) -> None:
+    async with SessionLocal() as db:
+        user = User(email=f"bench-import-{time.time_ns()}@example.invalid", hashed_password="-")
+        db.add(user)
+        await db.flush()
+        wallet = Wallet(user_id=user.id, name="Bench", type="CASH", balance=Decimal(10_000_000))
+        db.add(wallet)
+        await db.commit()
+
+    rows = make_rows(wallet.id, count)
+
+    # 1. Jalur lama: 1 request = 1 create_transaction (session baru tiap request)
+    started = time.perf_counter()
+    for row in rows:
+        async with SessionLocal() as db:
+            await create_transaction(trx_in=TransactionCreate(**row), current_user=user, db=db)
+    single_elapsed = time.perf_counter() - started
+
+    # 2. Jalur bulk: semua baris sekali jalan
+    started = time.perf_counter()
+    async with SessionLocal() as db:
+        result = await import_transactions(rows, user.id, db)
+    bulk_elapsed = time.perf_counter() - started
+
+    print(f"rows            : {count}")
+    print(f"single-row path : {single_elapsed:8.3f}s  {count / single_elapsed:10.1f} rows/s")
+    print(f"bulk import     : {bulk_elapsed:8.3f}s  {count / bulk_elapsed:10.1f} rows/s "
+          f"(imported={result.imported}, failed={result.failed})")
+    print(f"speedup         : {single_elapsed / bulk_elapsed:8.1f}x")
+
+    async with SessionLocal() as db:
+        await db.execute(delete(DailySpending).where(DailySpending.user_id == user.id))
+        await db.execute(delete(Transaction).where(Transaction.user_id == user.id))
+        await db.execute(delete(Wallet).where(Wallet.user_id == user.id))
+        await db.execute(delete(User).where(User.id == user.id))
+        await db.commit()
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows))
@@ -0,0 +1,288 @@
+"""
+Benchmark & regression akurasi pipeline OCR (offline).
+
+Struk sintetis di-render pakai PIL (merchant & total sudah diketahui) dalam beberapa
+ukuran & level noise, ditambah fixture di scripts/ocr_fixtures/. Semua dijalankan lewat
+preprocess_image -> Tesseract -> parse_merchant / parse_total, lalu dilaporkan:
+latency per tahap, throughput, peak memory, dan akurasi ekstraksi.
+
+Tiap varian dijalankan di proses baru (spawn), jadi throughput & peak memory per varian
+murni milik varian itu. Memory dipisah per tahap: RSS proses benchmark (decode + preprocess
++ parsing, Python) dan RSS proses Tesseract (child process, ru_maxrss RUSAGE_CHILDREN).
+
+Hasil ditulis sebagai JSON (bisa di-diff / dibandingkan antar commit).
+
+Cara pakai (dari folder backend):
+    python -m scripts.bench_ocr --output ocr_bench.json
+    python -m scripts.bench_ocr --skip-ocr    # tanpa Tesseract: parsing diuji pakai teks asli struk
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+
+import pytesseract
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+from app.services.ocr import (
+    OCR_PIPELINE_VERSION, TESSERACT_CONFIG, TESSERACT_LANG,
+    load_merchants, parse_merchant, parse_total, preprocess_image,
+)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "ocr_fixtures")
+
+# (nama varian, lebar kertas px, ukuran font px, level noise 0-1)
+VARIANTS = [
+    ("dot-matrix-small", 384, 14, 0.0),
+    ("thermal-clean", 800, 26, 0.0),
+    ("thermal-noisy", 800, 26, 0.35),
+    ("phone-photo", 2400, 72, 0.15),
+]
+
+UNKNOWN_MERCHANTS = ["TOKO MAJU JAYA", "WARUNG BU SRI", "APOTEK SEHAT SENTOSA", "BENGKEL MOTOR ABADI"]
+ITEMS = ["BERAS 5KG", "MINYAK GORENG", "GULA PASIR", "TELUR 1KG", "KOPI SACHET", "MIE INSTAN", "SABUN MANDI", "AIR MINERAL"]
+
+
+def format_rupiah(value: int) -> str:
+    return f"{value:,}".replace(",", ".")
+
+
+def receipt_lines(rng: random.Random) -> tuple[list[str], str, int]:
+    """Isi struk acak + jawaban yang benar (merchant, total)."""
+    if rng.random() < 0.7:
+        keyword, brand = rng.choice(load_merchants())
+        header, expected_merchant = keyword.upper(), brand
+    else:
+        header = expected_merchant = rng.choice(UNKNOWN_MERCHANTS)
+
+    items = [(name, rng.randrange(2_000, 95_000, 100)) for name in rng.sample(ITEMS, rng.randint(2, 6))]
+    total = sum(price for _, price in items)
+    cash = ((total // 50_000) + 1) * 50_000
+
+    lines = [header, "JL. MERDEKA NO. 17", f"{datetime(2026, 10, rng.randint(1, 28)):%d/%m/%Y} 08:15"]
+    lines += [f"{name}  {format_rupiah(price)}" for name, price in items]
+    lines += [
+        f"TOTAL BELANJA  {format_rupiah(total)}",
+        f"TUNAI  {format_rupiah(cash)}",
+        f"KEMBALI  {format_rupiah(cash - total)}",
+        "TERIMA KASIH",
+    ]
+    return lines, expected_merchant, total
+
+
+def render_receipt(lines: list[str], width: int, font_size: int, noise: float, rng: random.Random) -> bytes:
+    font = ImageFont.load_default(size=font_size)
+    line_height = int(font_size * 1.6)
+    margin = width // 20
+    height = line_height * (len(lines) + 2)
+
+    img = Image.new("L", (width, height), 245)
+    draw = ImageDraw.Draw(img)
+    for row, text in enumerate(lines):
+        y = line_height * (row + 1)
+        if "  " in text:
+            # Nominal rata kanan seperti struk asli
+            label, amount = text.rsplit("  ", 1)
+            draw.text((margin, y), label, font=font, fill=20)
+            draw.text((width - margin - draw.textlength(amount, font=font), y), amount, font=font, fill=20)
+        else:
+            draw.text((margin, y), text, font=font, fill=20)
+
+    if noise:
+        grain = Image.effect_noise(img.size, 60 * noise)
+        img = Image.blend(img, grain, noise * 0.5)
+        img = img.filter(ImageFilter.GaussianBlur(noise * 1.5))
+        img = img.rotate(rng.uniform(-2, 2), expand=True, fillcolor=245)
+
+    buffer = io.BytesIO()
+    img.convert("RGB").save(buffer, "JPEG", quality=85)
+    return buffer.getvalue()
+
+
+def build_samples(per_variant: int, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    samples = []
+    for name, width, font_size, noise in VARIANTS:
+        for index in range(per_variant):
+            lines, merchant, total = receipt_lines(rng)
+            samples.append({
+                "id": f"{name}-{index}",
+                "variant": name,
+                "image": render_receipt(lines, width, font_size, noise, rng),
+                "text": "\n".join(lines),
+                "merchant": merchant,
+                "amount": total,
+            })
+
+    manifest_path = os.path.join(FIXTURES_DIR, "manifest.json")
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            for fixture in json.load(f):
+                with open(os.path.join(FIXTURES_DIR, fixture["file"]), "rb") as image_file:
+                    samples.append({
+                        "id": f"fixture-{fixture['file']}",
+                        "variant": "fixture",
+                        "image": image_file.read(),
+                        "text": None, # Teks asli fixture tidak diketahui
+                        "merchant": fixture["merchant"],
+                        "amount": fixture["amount"],
+                    })
+    return samples
+
+
+def run_sample(sample: dict, skip_ocr: bool) -> dict:
+    timings: dict = {}
+    image = Image.open(io.BytesIO(sample["image"]))
+    processed = preprocess_image(image, timings=timings)
+
+    started = time.perf_counter()
+    if skip_ocr:
+        text_full = sample["text"]
+    else:
+        text_full = pytesseract.image_to_string(processed, config=TESSERACT_CONFIG, lang=TESSERACT_LANG)
+    timings["ocr"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    lines = [line for line in text_full.split("\n") if line.strip()]
+    merchant = parse_merchant(text_full, lines)
+    amount = parse_total(lines)
+    timings["parse"] = time.perf_counter() - started
+
+    return {
+        "id": sample["id"],
+        "variant": sample["variant"],
+        "input": f"{image.width}x{image.height}",
+        "stages_ms": {stage: round(seconds * 1000, 3) for stage, seconds in timings.items()},
+        "merchant": merchant,
+        "amount": amount,
+        "merchant_ok": merchant == sample["merchant"],
+        "amount_ok": amount == sample["amount"],
+    }
+
+
+def run_variant(samples: list[dict], skip_ocr: bool) -> dict:
+    """Jalan di proses baru: semua sample satu varian + waktu & peak memory varian itu sendiri."""
+    idle_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    results = [run_sample(sample, skip_ocr) for sample in samples]
+    elapsed = time.perf_counter() - started
+
+    tesseract_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return {
+        "results": results,
+        "elapsed": elapsed,
+        "memory_mb": {
+            "idle_rss": round(idle_kb / 1024, 1),
+            "preprocess_parse_peak_rss": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "ocr_peak_rss": None if skip_ocr else round(tesseract_kb / 1024, 1),
+        },
+    }
+
+
+def in_fresh_process(fn, *args):
+    # spawn (bukan fork), biar ru_maxrss gak "warisan" parent yang nyimpen semua gambar
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        return pool.submit(fn, *args).result()
+
+
+def peak_memory(runs: list[dict]) -> dict:
+    peaks = {}
+    for key in runs[0]["memory_mb"]:
+        values = [run["memory_mb"][key] for run in runs if run["memory_mb"][key] is not None]
+        peaks[key] = max(values) if values else None
+    return peaks
+
+
+def summarize(results: list[dict], elapsed: float, memory_mb: dict) -> dict:
+    stages = sorted({stage for result in results for stage in result["stages_ms"]})
+    latency = {}
+    for stage in stages + ["total"]:
+        values = sorted(
+            sum(r["stages_ms"].values()) if stage == "total" else r["stages_ms"].get(stage, 0)
+            for r in results
+        )
+        latency[stage] = {
+            "p50": round(statistics.median(values), 3),
+            "p95": round(values[min(len(values) - 1, int(len(values) * 0.95))], 3),
+            "max": round(values[-1], 3),
+        }
+
+    return {
+        "samples": len(results),
+        "throughput_per_s": round(len(results) / elapsed, 2),
+        "memory_mb": memory_mb,
+        "merchant_accuracy": round(sum(r["merchant_ok"] for r in results) / len(results), 4),
+        "amount_accuracy": round(sum(r["amount_ok"] for r in results) / len(results), 4),
+        "latency_ms": latency,
+    }
+
+
+def environment(skip_ocr: bool) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": commit or None,
+        "pipeline_version": OCR_PIPELINE_VERSION,
+        "tesseract": None if skip_ocr else str(pytesseract.get_tesseract_version()),
+        "tesseract_config": TESSERACT_CONFIG,
+        "tesseract_lang": TESSERACT_LANG,
+        "python": platform.python_version(),
+        "pillow": Image.__version__,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--per-variant", type=int, default=5, help="jumlah struk sintetis per varian")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-ocr", action="store_true", help="lewati Tesseract, parsing pakai teks asli")
+    parser.add_argument("--output", help="path file JSON hasil (default: stdout)")
+    args = parser.parse_args()
+
+    samples = build_samples(args.per_variant, args.seed)
+    if args.skip_ocr:
+        samples = [s for s in samples if s["text"] is not None]
+
+    runs = {}
+    for variant in sorted({s["variant"] for s in samples}):
+        runs[variant] = in_fresh_process(run_variant, [s for s in samples if s["variant"] == variant], args.skip_ocr)
+    results = [result for run in runs.values() for result in run["results"]]
+
+    report = {
+        "environment": environment(args.skip_ocr),
+        "summary": summarize(results, sum(run["elapsed"] for run in runs.values()), peak_memory(list(runs.values()))),
+        "by_variant": {
+            variant: summarize(run["results"], run["elapsed"], run["memory_mb"])
+            for variant, run in runs.items()
+        },
+        "results": results,
+    }
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+        summary = report["summary"]
+        print(f"{summary['samples']} samples  {summary['throughput_per_s']}/s  "
+              f"merchant={summary['merchant_accuracy']:.1%}  amount={summary['amount_accuracy']:.1%}  "
+              f"-> {args.output}")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
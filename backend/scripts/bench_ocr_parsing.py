@@ -0,0 +1,102 @@
+"""
+Micro-benchmark parse_merchant: waktu parsing vs ukuran kamus merchant.
+
+Kamus asli (data/merchants.csv) ditambah merchant sintetis sampai N entri.
+Dibandingkan: cek `keyword in text` satu-satu (cara lama) vs MerchantMatcher (regex trie).
+
+Keyword sintetis dibuat mirip nama toko asli & sengaja overlap dengan teks struk:
+prefix-nya diambil dari keyword merchant asli & kata/frasa di struk ("toko sembako", "ber",
+"gula pas", ...), lalu ditambah akhiran ("toko sembako makmur", "gula pasar", ...).
+Jadi regex harus jalan jauh di dalam trie di banyak posisi sebelum gagal, bukan langsung
+gagal di huruf pertama. Tetap gak ada yang cocok penuh (kasus terburuk: semua keyword dicek).
+
+Yang diharapkan: cara lama naik linear dengan jumlah entri, matcher cuma naik sedikit
+(dibatasi kedalaman trie di posisi yang overlap, bukan jumlah keyword).
+
+Cara pakai (dari folder backend):
+    python -m scripts.bench_ocr_parsing
+"""
+import random
+import string
+import time
+from itertools import pairwise
+
+from app.services.ocr import MerchantMatcher, load_merchants
+
+SIZES = [25, 1_000, 10_000, 50_000]
+REPEAT = 200
+
+RECEIPT = """TOKO SEMBAKO BERKAH
+JL. MERDEKA NO. 17 BANDUNG
+TELP 022-1234567
+19/10/2026 08:15  KASIR: ANI
+BERAS 5KG              72.500
+MINYAK GORENG 2L       38.900
+GULA PASIR 1KG         17.500
+TELUR 1KG              29.000
+TOTAL BELANJA         157.900
+TUNAI                 200.000
+KEMBALI                42.100
+TERIMA KASIH
+""".lower()
+
+
+SUFFIXES = ["jaya", "abadi", "makmur", "sentosa", "mandiri", "baru", "raya", "utama", "sejahtera", "express"]
+
+
+def receipt_prefixes(text: str) -> list[str]:
+    """Kata & frasa 2 kata dari struk, plus potongan awalnya ("sembako" -> "sem", "semb", ...)."""
+    words = [word for word in text.split() if word.isalpha() and len(word) >= 3]
+    phrases = words + [f"{a} {b}" for a, b in pairwise(words)]
+    return phrases + [word[:end] for word in words for end in range(2, len(word))]
+
+
+def synthetic_merchants(count: int) -> list[tuple[str, str]]:
+    rng = random.Random(count)
+    pairs = load_merchants()
+    prefixes = [keyword for keyword, _ in pairs] + receipt_prefixes(RECEIPT)
+    seen = {keyword for keyword, _ in pairs}
+    while len(pairs) < count:
+        prefix = rng.choice(prefixes)
+        if rng.random() < 0.5:
+            keyword = f"{prefix} {rng.choice(SUFFIXES)}" # "toko sembako jaya"
+        else:
+            keyword = prefix + "".join(rng.choices(string.ascii_lowercase, k=rng.randint(1, 4))) # "gula pasar"
+        if keyword in seen or keyword in RECEIPT:
+            continue # Harus tetap gak ketemu di struk
+        seen.add(keyword)
+        pairs.append((keyword, keyword.upper()))
+    return pairs
+
+
+def legacy_find(pairs: list[tuple[str, str]], text_lower: str):
+    for keyword, brand in pairs:
+        if keyword in text_lower:
+            return brand
+    return None
+
+
+def per_call_us(fn) -> float:
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        fn()
+    return (time.perf_counter() - started) / REPEAT * 1_000_000
+
+
+def main() -> None:
+    print(f"{'entries':>8} {'build ms':>9} {'legacy us/parse':>16} {'matcher us/parse':>17}")
+    for size in SIZES:
+        pairs = synthetic_merchants(size)
+
+        started = time.perf_counter()
+        matcher = MerchantMatcher(pairs)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        assert matcher.find(RECEIPT) == legacy_find(pairs, RECEIPT)
+        legacy_us = per_call_us(lambda: legacy_find(pairs, RECEIPT))
+        matcher_us = per_call_us(lambda: matcher.find(RECEIPT))
+        print(f"{size:>8} {build_ms:>9.1f} {legacy_us:>16.1f} {matcher_us:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark preprocess_image: waktu per tahap & peak memory, versi lama (selalu upscale 2x)
+vs versi sekarang (normalisasi resolusi + JPEG draft).
+
+Tiap kasus dijalankan di proses baru, supaya peak RSS (ru_maxrss) yang diukur
+murni milik kasus itu. Gambar dibuat sintetis (JPEG), tidak butuh Tesseract.
+
+Cara pakai (dari folder backend):
+    python -m scripts.bench_ocr_preprocess
+"""
+import io
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from PIL import Image, ImageDraw, ImageEnhance, ImageFilter
+
+# (label, lebar, tinggi)
+CASES = [
+    ("dot-matrix scan 0.5MP", 576, 900),
+    ("phone 12MP", 3000, 4000),
+    ("phone 48MP", 6000, 8000),
+]
+
+
+def make_jpeg(width: int, height: int) -> bytes:
+    img = Image.new("RGB", (width, height), (235, 232, 225))
+    draw = ImageDraw.Draw(img)
+    line_height = max(12, height // 60)
+    for y in range(line_height, height - line_height, line_height * 2):
+        draw.rectangle((width // 10, y, width * 9 // 10, y + line_height // 2), fill=(40, 40, 40))
+    buffer = io.BytesIO()
+    img.save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def legacy_preprocess(image: Image.Image, timings: dict) -> Image.Image:
+    """Salinan preprocess_image versi lama (sebelum normalisasi resolusi), buat pembanding."""
+    clock = time.perf_counter()
+    image.load()
+    timings["decode"] = time.perf_counter() - clock
+
+    clock = time.perf_counter()
+    img = image.resize((image.width * 2, image.height * 2), Image.Resampling.LANCZOS)
+    timings["resize"] = time.perf_counter() - clock
+
+    clock = time.perf_counter()
+    img = img.convert('L')
+    timings["grayscale"] = time.perf_counter() - clock
+
+    clock = time.perf_counter()
+    img = ImageEnhance.Contrast(img).enhance(1.5)
+    img = img.filter(ImageFilter.SHARPEN)
+    timings["enhance"] = time.perf_counter() - clock
+    return img
+
+
+def run_case(variant: str, data: bytes) -> dict:
+    from app.services.ocr import preprocess_image
+
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    timings: dict = {}
+    started = time.perf_counter()
+
+    image = Image.open(io.BytesIO(data))
+    if variant == "legacy":
+        output = legacy_preprocess(image, timings)
+    else:
+        output = preprocess_image(image, timings=timings)
+
+    return {
+        "total_ms": (time.perf_counter() - started) * 1000,
+        "stages_ms": {stage: seconds * 1000 for stage, seconds in timings.items()},
+        "output": output.size,
+        "baseline_mb": baseline_kb / 1024,
+        "peak_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def in_fresh_process(fn, *args):
+    # spawn (bukan fork) + gambar dibuat di proses lain juga, biar ru_maxrss gak "warisan" parent
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        return pool.submit(fn, *args).result()
+
+
+def main() -> None:
+    for label, width, height in CASES:
+        data = in_fresh_process(make_jpeg, width, height)
+        print(f"\n{label} ({width}x{height}, {len(data) / 1024:.0f} KB JPEG)")
+
+        for variant in ("legacy", "current"):
+            result = in_fresh_process(run_case, variant, data)
+
+            stages = "  ".join(f"{k}={v:.0f}" for k, v in result["stages_ms"].items())
+            print(f"  {variant:<8} total={result['total_ms']:7.0f} ms  peak RSS={result['peak_mb']:5.0f} MB (idle {result['baseline_mb']:.0f})  "
+                  f"out={result['output'][0]}x{result['output'][1]}  [{stages}]")
+
+
+if __name__ == "__main__":
+    main()
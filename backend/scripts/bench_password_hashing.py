@@ -0,0 +1,63 @@
+"""
+Benchmark latency event loop saat banyak login bersamaan (tanpa DB).
+
+Ada task "ticker" yang tidur 10 ms berulang-ulang. Kalau event loop ke-block,
+ticker telat bangun -> telatnya itu yang diukur (= yang dirasakan request lain).
+Dibandingkan: bcrypt langsung di event loop (cara lama) vs lewat thread pool.
+
+Cara pakai (dari folder backend):
+    python -m scripts.bench_password_hashing --logins 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.core.config import settings
+from app.core.security import pwd_context, verify_password
+
+TICK = 0.010
+
+
+async def ticker(stop: asyncio.Event, lags: list[float]) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append((time.perf_counter() - started - TICK) * 1000)
+
+
+async def blocking_verify(plain: str, hashed: str) -> bool:
+    return pwd_context.verify(plain, hashed) # Cara lama: CPU-bound langsung di event loop
+
+
+async def run(label: str, verify, logins: int, hashed: str) -> None:
+    lags: list[float] = []
+    stop = asyncio.Event()
+    tick_task = asyncio.create_task(ticker(stop, lags))
+    await asyncio.sleep(TICK * 2)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(verify("password123", hashed) for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await tick_task
+
+    lags.sort()
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+    print(f"{label:<14} logins/s={logins / elapsed:7.1f}  "
+          f"loop lag ms: median={statistics.median(lags):7.1f} p99={p99:7.1f} max={lags[-1]:7.1f}")
+
+
+async def main(logins: int) -> None:
+    hashed = pwd_context.hash("password123")
+    print(f"bcrypt rounds={settings.BCRYPT_ROUNDS}  workers={settings.PASSWORD_HASH_WORKERS}  logins={logins}")
+    await run("blocking", blocking_verify, logins, hashed)
+    await run("thread pool", verify_password, logins, hashed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins))
@@ -0,0 +1,141 @@
+"""
+Benchmark serialisasi list besar: jalur lama (objek ORM -> model Pydantic -> json.dumps)
+vs jalur cepat (proyeksi kolom -> dict -> orjson) di get_transactions & read_wallets.
+
+Yang diukur CPU time (time.process_time) per baris, dari query sampai body JSON jadi,
+median dari --repeat kali. Output kedua jalur juga dibandingkan byte-per-byte.
+
+Cara pakai (dari folder backend, DB sudah di-migrate):
+    python -m scripts.bench_serialization --rows 5000 --repeat 5
+
+Data benchmark dihapus lagi di akhir.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import delete, insert
+from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
+
+from app.core.database import engine, SessionLocal
+from app.models.user import User
+from app.models.wallet import Wallet
+from app.models.transaction import Transaction, TransactionType, Category
+from app.routers.transactions import get_transactions
+from app.routers.wallets import read_wallets
+from app.schemas.transaction import TransactionResponse
+from app.schemas.wallet import WalletResponse
+
+WALLETS = 50
+
+
+async def seed(count: int) -> User:
+    async with SessionLocal() as db:
+        user = User(email=f"bench-serialization-{time.time_ns()}@example.invalid", hashed_password="-")
+        db.add(user)
+        await db.flush()
+        wallets = [Wallet(user_id=user.id, name=f"Dompet {i}", type="BANK", balance=Decimal("1500000.50")) for i in range(WALLETS)]
+        categories = [Category(user_id=user.id, name=f"Kategori {i}", type="EXPENSE") for i in range(10)]
+        db.add_all(wallets + categories)
+        await db.flush()
+
+        start = datetime.now(timezone.utc) - timedelta(days=365)
+        await db.execute(insert(Transaction), [
+            {
+                "user_id": user.id,
+                "wallet_id": wallets[i % WALLETS].id,
+                "category_id": None if i % 10 == 0 else categories[i % 10].id, # Sebagian tanpa kategori
+                "type": TransactionType.EXPENSE,
+                "amount": Decimal(25_000 + i),
+                "date": start + timedelta(minutes=i * 7),
+                "description": f"Belanja #{i}",
+            }
+            for i in range(count)
+        ])
+        await db.commit()
+    return user
+
+
+async def legacy_transactions(user: User) -> bytes:
+    # Jalur sebelumnya: ORM + selectinload, validasi response_model, lalu JSONResponse (json.dumps)
+    async with SessionLocal() as db:
+        result = await db.execute(
+            select(Transaction).options(selectinload(Transaction.category))
+            .where(Transaction.user_id == user.id, Transaction.deleted_at == None)
+            .order_by(Transaction.date.desc(), Transaction.id.desc())
+        )
+        adapter = TypeAdapter(list[TransactionResponse])
+        content = adapter.dump_python(adapter.validate_python(result.scalars().all()), mode="json")
+        return JSONResponse(content).body
+
+
+async def fast_transactions(user: User) -> bytes:
+    async with SessionLocal() as db:
+        response = await get_transactions(limit=50, cursor=None, legacy=True, current_user=user, db=db)
+        return response.body
+
+
+async def legacy_wallets(user: User) -> bytes:
+    async with SessionLocal() as db:
+        result = await db.execute(select(Wallet).where(Wallet.user_id == user.id, Wallet.deleted_at == None))
+        adapter = TypeAdapter(list[WalletResponse])
+        content = adapter.dump_python(adapter.validate_python(result.scalars().all()), mode="json")
+        return JSONResponse(content).body
+
+
+async def fast_wallets(user: User) -> bytes:
+    async with SessionLocal() as db:
+        response = await read_wallets(current_user=user, db=db)
+        return response.body
+
+
+async def measure(fn, user: User, repeat: int) -> tuple[float, bytes]:
+    body = await fn(user) # Pemanasan (compile cache SQLAlchemy, koneksi pool)
+    timings = []
+    for _ in range(repeat):
+        started = time.process_time()
+        body = await fn(user)
+        timings.append(time.process_time() - started)
+    return statistics.median(timings), body
+
+
+async def main(count: int, repeat: int) -> int:
+    user = await seed(count)
+    identical = True
+    try:
+        print(f"{'endpoint':<18} {'baris':>7} {'lama us/baris':>14} {'baru us/baris':>14} {'speedup':>8}  output")
+        for label, rows, legacy, fast in [
+            ("get_transactions", count, legacy_transactions, fast_transactions),
+            ("read_wallets", WALLETS, legacy_wallets, fast_wallets),
+        ]:
+            legacy_cpu, legacy_body = await measure(legacy, user, repeat)
+            fast_cpu, fast_body = await measure(fast, user, repeat)
+            same = legacy_body == fast_body
+            identical &= same
+            print(f"{label:<18} {rows:>7} {legacy_cpu / rows * 1e6:>14.2f} {fast_cpu / rows * 1e6:>14.2f} "
+                  f"{legacy_cpu / fast_cpu:>7.1f}x  {'identik' if same else 'BEDA'}")
+    finally:
+        async with SessionLocal() as db:
+            await db.execute(delete(Transaction).where(Transaction.user_id == user.id))
+            await db.execute(delete(Category).where(Category.user_id == user.id))
+            await db.execute(delete(Wallet).where(Wallet.user_id == user.id))
+            await db.execute(delete(User).where(User.id == user.id))
+            await db.commit()
+        await engine.dispose()
+
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000, help="jumlah transaksi")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.rows, args.repeat)))
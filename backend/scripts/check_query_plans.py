@@ -0,0 +1,159 @@
+"""
+Cek query plan & budget query semua endpoint READ di router: gagal (exit 1) kalau ada
+query yang Seq Scan / full index scan, index yang diharapkan gak kepakai, atau endpoint
+yang jalanin statement lebih dari budget-nya / ada N+1.
+
+Cara pakai (dari folder backend, DB sudah di-migrate `alembic upgrade head`):
+    python -m scripts.check_query_plans
+
+Cara kerja:
+1. Bikin user/wallet/kategori/transaksi dummy (di-flush, TIDAK di-commit).
+2. Panggil langsung fungsi endpoint-nya, semua SQL yang lewat engine direkam.
+   Jumlah statement tiap endpoint dicek terhadap budget (assert_max_queries), cache masih dingin.
+3. Tiap SQL di-EXPLAIN dengan `enable_seqscan = off`. Kalau planner TETAP pilih
+   Seq Scan, artinya memang gak ada index yang bisa dipakai -> gagal.
+   Seq Scan yang dimatikan bisa "pindah" jadi scan seluruh index (mis. transactions_pkey
+   tanpa Index Cond), jadi index scan tanpa Index Cond juga gagal, dan index yang
+   diharapkan tiap endpoint (mis. ix_transactions_user_date_active) wajib muncul di plan.
+4. Rollback, DB bersih lagi.
+"""
+import asyncio
+import json
+import sys
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import event
+
+from app.api.deps import get_current_user
+from app.core.database import engine, SessionLocal
+from app.core.pagination import encode_cursor
+from app.core.query_inspector import assert_max_queries
+from app.core.security import create_access_token
+from app.models.user import User
+from app.models.wallet import Wallet
+from app.models.transaction import Transaction, TransactionType, Category
+from app.routers.health import check_financial_health
+from app.routers.transactions import get_categories, get_transactions
+from app.routers.wallets import read_wallets
+
+
+def walk_plan(plan: dict):
+    """Semua node di tree plan dari EXPLAIN (FORMAT JSON)."""
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from walk_plan(child)
+
+
+def find_full_scans(plan: dict) -> list[str]:
+    """Seq Scan, atau Index / Index Only / Bitmap Index Scan tanpa Index Cond (baca seluruh index)."""
+    found = []
+    for node in walk_plan(plan):
+        if node.get("Node Type") == "Seq Scan":
+            found.append(f"Seq Scan on {node.get('Relation Name', '?')}")
+        elif "Index Name" in node and not node.get("Index Cond"):
+            found.append(f"{node['Node Type']} using {node['Index Name']} tanpa Index Cond")
+    return found
+
+
+def used_indexes(plan: dict) -> set[str]:
+    return {node["Index Name"] for node in walk_plan(plan) if "Index Name" in node}
+
+
+async def seed(db) -> User:
+    user = User(email="explain-check@example.invalid", hashed_password="-", full_name="Explain Check")
+    db.add(user)
+    await db.flush()
+
+    wallet = Wallet(user_id=user.id, name="Explain Wallet", type="CASH", balance=Decimal(100000))
+    category = Category(user_id=user.id, name="Explain Category", type="EXPENSE", is_fixed=False)
+    db.add_all([wallet, category])
+    await db.flush()
+
+    db.add(Transaction(
+        user_id=user.id, wallet_id=wallet.id, category_id=category.id,
+        type=TransactionType.EXPENSE, amount=Decimal(5000), date=datetime.now().astimezone(),
+        description="Explain Trx"
+    ))
+    await db.flush()
+    return user
+
+
+async def main() -> int:
+    captured: list[tuple[str, str, object]] = []
+    current_label = {"name": ""}
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((current_label["name"], statement, parameters))
+
+    async with SessionLocal() as db:
+        user = await seed(db)
+        token = create_access_token(data={"sub": user.email, "id": user.id})
+
+        # Endpoint READ yang mau dicek: (budget statement, index yang wajib kepakai, panggilan).
+        # Tambah di sini kalau ada endpoint baru.
+        # get_transactions: 1 query list + 1 load kategori kalau cache kategori belum ada
+        checks = {
+            "get_current_user": (1, {"users_pkey"}, lambda: get_current_user(db=db, token=token)),
+            "read_wallets": (1, {"ix_wallets_user_active"}, lambda: read_wallets(current_user=user, db=db)),
+            "get_categories": (1, {"ix_categories_user_id"}, lambda: get_categories(current_user=user, db=db)),
+            "get_transactions": (2, {"ix_transactions_user_date_active"}, lambda: get_transactions(
+                limit=50, cursor=None, legacy=False, current_user=user, db=db
+            )),
+            "get_transactions (cursor)": (2, {"ix_transactions_user_date_active"}, lambda: get_transactions(
+                limit=50, cursor=encode_cursor(datetime.now().astimezone(), 2**31 - 1),
+                legacy=False, current_user=user, db=db
+            )),
+            "check_financial_health": (1, {"ix_wallets_user_active", "daily_spending_pkey"},
+                                       lambda: check_financial_health(current_user=user, db=db)),
+        }
+
+        failures = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            for label, (budget, _, call) in checks.items():
+                current_label["name"] = label
+                try:
+                    with assert_max_queries(budget, repeat_threshold=2):
+                        await call()
+                except AssertionError as e:
+                    failures += 1
+                    print(f"[FAIL] {label}: {e}")
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+        conn = await db.connection()
+        await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+
+        indexes_by_label: dict[str, set[str]] = {label: set() for label in checks}
+        for label, statement, parameters in captured:
+            result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            plan = result.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+
+            indexes_by_label[label] |= used_indexes(plan[0]["Plan"])
+            full_scans = find_full_scans(plan[0]["Plan"])
+            if full_scans:
+                failures += 1
+                print(f"[FAIL] {label}: {', '.join(full_scans)}")
+                print(f"       {' '.join(statement.split())}")
+            else:
+                print(f"[OK]   {label}")
+
+        for label, (_, expected, _) in checks.items():
+            missing = expected - indexes_by_label[label]
+            if missing:
+                failures += 1
+                print(f"[FAIL] {label}: index {', '.join(sorted(missing))} gak kepakai "
+                      f"(plan pakai: {', '.join(sorted(indexes_by_label[label])) or '-'})")
+
+        await db.rollback()
+
+    await engine.dispose()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,484 @@
+"""
+Load test end-to-end API: seed data sintetis, jalankan workload campuran, ukur latency per route.
+
+- Seed: --users user, masing-masing --wallets dompet, --categories kategori & --transactions transaksi
+  tersebar --days hari terakhir (bulk insert, saldo & rollup daily_spending ikut konsisten).
+  Semua user pakai password LOADTEST_PASSWORD.
+- Workload: --concurrency virtual user, tiap iterasi pilih route sesuai bobot --mix, selama --duration detik
+  (--warmup detik pertama tidak dihitung). Default mix:
+  get_transactions=35, create_transaction=20, read_wallets=15, health=15, get_categories=10, login=5
+- Target:
+  - default: app di-load in-process lewat ASGI (tanpa server & network, latency = biaya app + DB).
+    Jumlah statement SQL per request ikut dilaporkan.
+  - --base-url http://localhost:8000: uvicorn yang sudah jalan, pakai DATABASE_URL & SECRET_KEY yang sama.
+- Report: throughput + p50/p95/p99 per route, disimpan JSON (key urut, angka dibulatkan) biar gampang di-diff.
+
+Cara pakai (dari folder backend, DB sudah di-migrate):
+    python -m scripts.loadtest --users 50 --transactions 2000 --concurrency 20 --duration 30 --output loadtest.json
+    python -m scripts.loadtest --base-url http://localhost:8000 --mix get_transactions=3,health=1
+
+Data seed (dan transaksi yang dibuat selama test) dihapus lagi di akhir, kecuali --keep.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Optional
+from urllib.parse import urlencode, urlsplit
+
+from sqlalchemy import delete, insert
+
+from app.core.database import engine, SessionLocal
+from app.core.query_inspector import track_queries
+from app.core.security import create_access_token, get_password_hash
+from app.models.user import User
+from app.models.wallet import Wallet
+from app.models.transaction import Transaction, TransactionType, Category, DailySpending
+from app.services.daily_spending import rebuild_for_users
+
+LOADTEST_PASSWORD = "loadtest-password"
+DEFAULT_MIX = "get_transactions=35,create_transaction=20,read_wallets=15,health=15,get_categories=10,login=5"
+INSERT_CHUNK = 5000
+
+EXPENSE_CATEGORIES = ["Makan", "Transport", "Belanja", "Tagihan", "Hiburan", "Kesehatan", "Pendidikan", "Kost"]
+INCOME_CATEGORIES = ["Gaji", "Bonus", "Freelance", "Investasi"]
+MERCHANTS = ["Indomaret", "Alfamart", "Gojek", "Grab", "Tokopedia", "Shopee", "PLN", "Warteg Bahari", "Starbucks"]
+
+
+# --- Seed ---
+
+def _generate_user_data(rng: random.Random, wallets: int, categories: int, transactions: int, days: int) -> dict:
+    """Data 1 user, wallet & kategori direferensikan lewat index (id baru ada setelah insert)."""
+    expense_count = max(1, categories - categories // 3)
+    category_defs = (
+        [(EXPENSE_CATEGORIES[i % len(EXPENSE_CATEGORIES)], "EXPENSE") for i in range(expense_count)]
+        + [(INCOME_CATEGORIES[i % len(INCOME_CATEGORIES)], "INCOME") for i in range(max(1, categories - expense_count))]
+    )
+    expense_idx = [i for i, (_, kind) in enumerate(category_defs) if kind == "EXPENSE"]
+    income_idx = [i for i, (_, kind) in enumerate(category_defs) if kind == "INCOME"]
+
+    opening = [Decimal(100_000_000)] * wallets
+    balances = list(opening)
+    now = datetime.now(timezone.utc)
+    rows = []
+    for _ in range(transactions):
+        wallet = rng.randrange(wallets)
+        roll = rng.random()
+        row = {
+            "wallet": wallet,
+            "target_wallet": None,
+            "category": None,
+            "date": now - timedelta(seconds=rng.randrange(days * 86400)),
+            "description": rng.choice(MERCHANTS),
+        }
+        if roll < 0.15:
+            row.update(type=TransactionType.INCOME, amount=Decimal(rng.randrange(1_000_000, 15_000_000, 1000)),
+                       category=rng.choice(income_idx), description=None)
+            balances[wallet] += row["amount"]
+        elif roll < 0.20 and wallets > 1:
+            target = (wallet + 1 + rng.randrange(wallets - 1)) % wallets
+            row.update(type=TransactionType.TRANSFER, amount=Decimal(rng.randrange(50_000, 2_000_000, 1000)),
+                       target_wallet=target, description="Transfer")
+            balances[wallet] -= row["amount"]
+            balances[target] += row["amount"]
+        else:
+            row.update(type=TransactionType.EXPENSE, amount=Decimal(rng.randrange(5_000, 500_000, 500)),
+                       category=rng.choice(expense_idx))
+            balances[wallet] -= row["amount"]
+        rows.append(row)
+
+    return {"categories": category_defs, "opening": opening, "balances": balances, "transactions": rows}
+
+
+async def seed(args) -> list[dict]:
+    """Insert data sintetis, return profil user buat virtual user (id, email, token, wallet & kategori)."""
+    rng = random.Random(args.seed)
+    run_tag = time.time_ns()
+    hashed_password = await get_password_hash(LOADTEST_PASSWORD) # 1x bcrypt, dipakai semua user
+
+    profiles = []
+    async with SessionLocal() as db:
+        user_rows = (await db.execute(
+            insert(User).returning(User.id, User.email, sort_by_parameter_order=True),
+            [{"email": f"loadtest-{run_tag}-{i}@example.invalid", "hashed_password": hashed_password,
+              "full_name": f"Load Test {i}"} for i in range(args.users)],
+        )).all()
+
+        pending: list[dict] = []
+        for user_id, email in user_rows:
+            data = _generate_user_data(rng, args.wallets, args.categories, args.transactions, args.days)
+
+            wallet_ids = list((await db.execute(
+                insert(Wallet).returning(Wallet.id, sort_by_parameter_order=True),
+                [{"user_id": user_id, "name": f"Dompet {i + 1}", "type": "BANK",
+                  "opening_balance": data["opening"][i], "balance": data["balances"][i]}
+                 for i in range(args.wallets)],
+            )).scalars())
+            category_ids = list((await db.execute(
+                insert(Category).returning(Category.id, sort_by_parameter_order=True),
+                [{"user_id": user_id, "name": name, "type": kind, "is_fixed": False}
+                 for name, kind in data["categories"]],
+            )).scalars())
+
+            for row in data["transactions"]:
+                pending.append({
+                    "user_id": user_id,
+                    "wallet_id": wallet_ids[row["wallet"]],
+                    "target_wallet_id": None if row["target_wallet"] is None else wallet_ids[row["target_wallet"]],
+                    "category_id": None if row["category"] is None else category_ids[row["category"]],
+                    "type": row["type"],
+                    "amount": row["amount"],
+                    "date": row["date"],
+                    "description": row["description"],
+                })
+            if len(pending) >= INSERT_CHUNK:
+                await db.execute(insert(Transaction), pending)
+                pending = []
+
+            profiles.append({
+                "id": user_id,
+                "email": email,
+                "token": create_access_token({"sub": email, "id": user_id}),
+                "wallet_ids": wallet_ids,
+                "expense_category_ids": [
+                    cid for cid, (_, kind) in zip(category_ids, data["categories"]) if kind == "EXPENSE"
+                ],
+            })
+
+        if pending:
+            await db.execute(insert(Transaction), pending)
+        await rebuild_for_users(db, [p["id"] for p in profiles])
+        await db.commit()
+
+    return profiles
+
+
+async def cleanup(user_ids: list[int]) -> None:
+    async with SessionLocal() as db:
+        await db.execute(delete(DailySpending).where(DailySpending.user_id.in_(user_ids)))
+        await db.execute(delete(Transaction).where(Transaction.user_id.in_(user_ids)))
+        await db.execute(delete(Category).where(Category.user_id.in_(user_ids)))
+        await db.execute(delete(Wallet).where(Wallet.user_id.in_(user_ids)))
+        await db.execute(delete(User).where(User.id.in_(user_ids)))
+        await db.commit()
+
+
+# --- Client ---
+
+class ASGIClient:
+    """Panggil app FastAPI langsung (in-process), sekalian hitung statement SQL per request."""
+
+    def __init__(self, app):
+        self.app = app
+        self.last_statements: Optional[int] = None
+
+    async def request(self, method: str, path: str, headers: dict, body: bytes) -> int:
+        path, _, query = path.partition("?")
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+            "query_string": query.encode(), "root_path": "",
+            "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+            "client": ("127.0.0.1", 0), "server": ("loadtest", 80),
+        }
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+        status = 500
+
+        async def receive():
+            return messages.pop() if messages else {"type": "http.disconnect"}
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        with track_queries() as log:
+            try:
+                await self.app(scope, receive, send)
+            except Exception:
+                # ServerErrorMiddleware kirim 500 lalu raise ulang error-nya (deadlock, pool timeout, ...).
+                # Dihitung sebagai error response, jangan sampai 1 error menghentikan seluruh load test.
+                pass
+        self.last_statements = log.count
+        return status
+
+    async def close(self) -> None:
+        pass
+
+
+class HTTPClient:
+    """Klien HTTP/1.1 minimal (1 koneksi keep-alive per virtual user) biar gak nambah dependency."""
+
+    def __init__(self, base_url: str):
+        url = urlsplit(base_url)
+        self.host = url.hostname
+        self.port = url.port or 80
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.last_statements: Optional[int] = None
+
+    async def request(self, method: str, path: str, headers: dict, body: bytes) -> int:
+        try:
+            return await self._request(method, path, headers, body)
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            await self.close() # Koneksi rusak, request berikutnya connect ulang
+            raise
+
+    async def _request(self, method: str, path: str, headers: dict, body: bytes) -> int:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", f"Content-Length: {len(body)}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("server menutup koneksi")
+        status = int(status_line.split()[1])
+
+        response_headers = {}
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip().lower()
+
+        if response_headers.get("transfer-encoding") == "chunked":
+            while size := int((await self.reader.readline()).split(b";")[0], 16):
+                await self.reader.readexactly(size + 2)
+            await self.reader.readline()
+        else:
+            await self.reader.readexactly(int(response_headers.get("content-length", 0)))
+
+        if response_headers.get("connection") == "close":
+            await self.close()
+        self.last_statements = response_headers.get("x-db-queries") and int(response_headers["x-db-queries"])
+        return status
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+# --- Workload ---
+
+def _json(payload: dict) -> tuple[dict, bytes]:
+    return {"content-type": "application/json"}, json.dumps(payload).encode()
+
+
+def op_login(user: dict, rng: random.Random):
+    body = urlencode({"username": user["email"], "password": LOADTEST_PASSWORD}).encode()
+    return "POST", "/api/v1/auth/login", {"content-type": "application/x-www-form-urlencoded"}, body
+
+
+def op_create_transaction(user: dict, rng: random.Random):
+    headers, body = _json({
+        "wallet_id": rng.choice(user["wallet_ids"]),
+        "category_id": rng.choice(user["expense_category_ids"]),
+        "amount": str(rng.randrange(5_000, 200_000, 500)),
+        "type": "EXPENSE",
+        "date": datetime.now(timezone.utc).isoformat(),
+        "description": rng.choice(MERCHANTS),
+    })
+    return "POST", "/api/v1/transactions/", headers, body
+
+
+def op_get_transactions(user: dict, rng: random.Random):
+    return "GET", "/api/v1/transactions/?limit=50", {}, b""
+
+
+def op_read_wallets(user: dict, rng: random.Random):
+    return "GET", "/api/v1/wallets/", {}, b""
+
+
+def op_health(user: dict, rng: random.Random):
+    return "GET", "/api/v1/health/", {}, b""
+
+
+def op_get_categories(user: dict, rng: random.Random):
+    return "GET", "/api/v1/transactions/categories", {}, b""
+
+
+OPERATIONS = {
+    "login": op_login,
+    "create_transaction": op_create_transaction,
+    "get_transactions": op_get_transactions,
+    "read_wallets": op_read_wallets,
+    "health": op_health,
+    "get_categories": op_get_categories,
+}
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"route tidak dikenal: {name} (pilihan: {', '.join(OPERATIONS)})")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+async def virtual_user(index: int, client, profiles: list[dict], mix: dict[str, int], seed: int,
+                       measure_from: float, deadline: float, samples: dict) -> None:
+    rng = random.Random(seed * 1000 + index)
+    names, weights = list(mix), list(mix.values())
+    try:
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            user = rng.choice(profiles)
+            method, path, headers, body = OPERATIONS[name](user, rng)
+            if name != "login":
+                headers = {**headers, "authorization": f"Bearer {user['token']}"}
+
+            started = time.perf_counter()
+            try:
+                status = await client.request(method, path, headers, body)
+            except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+                status = type(e).__name__
+            elapsed = time.perf_counter() - started
+
+            if started >= measure_from:
+                route = samples.setdefault(name, {"latency": [], "statuses": {}, "statements": []})
+                route["latency"].append(elapsed)
+                route["statuses"][str(status)] = route["statuses"].get(str(status), 0) + 1
+                if client.last_statements is not None:
+                    route["statements"].append(client.last_statements)
+    finally:
+        await client.close()
+
+
+# --- Report ---
+
+def _percentile(values: list[float], q: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def summarize_route(route: dict, window: float) -> dict:
+    latency = sorted(ms * 1000 for ms in route["latency"])
+    ok = route["statuses"].get("200", 0)
+    summary = {
+        "requests": len(latency),
+        "errors": len(latency) - ok,
+        "statuses": dict(sorted(route["statuses"].items())),
+        "throughput_per_s": round(len(latency) / window, 2),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latency), 3),
+            "p50": round(_percentile(latency, 0.50), 3),
+            "p95": round(_percentile(latency, 0.95), 3),
+            "p99": round(_percentile(latency, 0.99), 3),
+            "max": round(latency[-1], 3),
+        },
+    }
+    if route["statements"]:
+        summary["sql_statements_per_request"] = round(statistics.fmean(route["statements"]), 2)
+    return summary
+
+
+def environment(target: str) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": commit or None,
+        "python": platform.python_version(),
+        "database": engine.dialect.name, # Cuma nama dialect, URL (ada password) tidak ikut disimpan
+        "target": target,
+    }
+
+
+async def main(args) -> int:
+    mix = parse_mix(args.mix)
+
+    print(f"seed: {args.users} user x {args.wallets} wallet, {args.categories} kategori, {args.transactions} transaksi ...")
+    started = time.perf_counter()
+    profiles = await seed(args)
+    seed_seconds = time.perf_counter() - started
+    print(f"seed selesai dalam {seed_seconds:.1f} s")
+
+    if args.base_url:
+        target = args.base_url
+        clients = [HTTPClient(args.base_url) for _ in range(args.concurrency)]
+    else:
+        from app.main import app # Import di sini: mode --base-url gak perlu load app
+        target = "asgi"
+        clients = [ASGIClient(app) for _ in range(args.concurrency)]
+
+    samples: dict = {}
+    try:
+        started = time.perf_counter()
+        measure_from = started + args.warmup
+        deadline = measure_from + args.duration
+        print(f"workload: {args.concurrency} virtual user, warmup {args.warmup:g} s + {args.duration:g} s ({target})")
+        await asyncio.gather(*(
+            virtual_user(i, client, profiles, mix, args.seed, measure_from, deadline, samples)
+            for i, client in enumerate(clients)
+        ))
+        window = time.perf_counter() - measure_from
+    finally:
+        if not args.keep:
+            await cleanup([p["id"] for p in profiles])
+        await engine.dispose()
+
+    routes = {name: summarize_route(route, window) for name, route in sorted(samples.items())}
+    total = sum(r["requests"] for r in routes.values())
+    errors = sum(r["errors"] for r in routes.values())
+    report = {
+        "environment": environment(target),
+        "config": {
+            "users": args.users, "wallets_per_user": args.wallets, "categories_per_user": args.categories,
+            "transactions_per_user": args.transactions, "days": args.days, "concurrency": args.concurrency,
+            "duration_s": args.duration, "warmup_s": args.warmup, "mix": mix, "seed": args.seed,
+        },
+        "summary": {
+            "requests": total,
+            "errors": errors,
+            "throughput_per_s": round(total / window, 2),
+            "seed_seconds": round(seed_seconds, 2),
+        },
+        "routes": routes,
+    }
+
+    print(f"\n{'route':<20} {'req':>7} {'err':>5} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'sql':>5}")
+    for name, route in routes.items():
+        latency = route["latency_ms"]
+        print(f"{name:<20} {route['requests']:>7} {route['errors']:>5} {route['throughput_per_s']:>8} "
+              f"{latency['p50']:>9} {latency['p95']:>9} {latency['p99']:>9} {route.get('sql_statements_per_request', '-'):>5}")
+    print(f"total: {total} request, {errors} error, {report['summary']['throughput_per_s']} req/s")
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--wallets", type=int, default=3, help="wallet per user")
+    parser.add_argument("--categories", type=int, default=8, help="kategori per user")
+    parser.add_argument("--transactions", type=int, default=1000, help="transaksi per user")
+    parser.add_argument("--days", type=int, default=180, help="rentang tanggal transaksi seed")
+    parser.add_argument("--concurrency", type=int, default=20, help="jumlah virtual user")
+    parser.add_argument("--duration", type=float, default=30, help="detik yang diukur")
+    parser.add_argument("--warmup", type=float, default=5, help="detik pemanasan (tidak dihitung)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="bobot route, format nama=bobot,...")
+    parser.add_argument("--base-url", help="tembak server yang jalan (default: app in-process lewat ASGI)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="jangan hapus data seed di akhir")
+    parser.add_argument("--output", help="path file JSON hasil (default: stdout)")
+    sys.exit(asyncio.run(main(parser.parse_args())))
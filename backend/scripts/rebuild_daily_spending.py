@@ -0,0 +1,89 @@
+"""
+Backfill / rebuild tabel rollup `daily_spending` dari tabel transactions.
+
+Migration sudah backfill sekali saat tabel dibuat. Script ini buat kalau rollup perlu
+dihitung ulang (data diubah manual di DB, bug, dsb). Diproses per batch user (keyset by id),
+1 DB transaction per batch, jadi memori & lock tetap kecil.
+
+Jalankan saat traffic sepi: transaksi yang masuk PERSIS saat batch user-nya diproses
+bisa ikut terhitung dobel / kelewat. Cukup jalankan ulang untuk user tersebut.
+
+Cara pakai (dari folder backend):
+    python -m scripts.rebuild_daily_spending
+    python -m scripts.rebuild_daily_spending --user-id 42
+    python -m scripts.rebuild_daily_spending --check   # cuma bandingkan, tidak menulis
+"""
+import argparse
+import asyncio
+import sys
+import time
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy.future import select
+
+from app.core.database import SessionLocal
+from app.models.user import User
+from app.models.transaction import DailySpending
+from app.services.daily_spending import rebuild_for_users
+
+
+async def rollup_snapshot(db, user_ids: list[int]) -> dict:
+    # user_id -> {(day, category_id, type): (total, jumlah transaksi)}
+    result = await db.execute(
+        select(DailySpending.user_id, DailySpending.day, DailySpending.category_id,
+               DailySpending.type, DailySpending.total, DailySpending.tx_count)
+        .where(DailySpending.user_id.in_(user_ids), DailySpending.tx_count != 0)
+    )
+    snapshot: dict = {}
+    for uid, day, category_id, trx_type, total, count in result:
+        snapshot.setdefault(uid, {})[(day, category_id, trx_type)] = (Decimal(total), count)
+    return snapshot
+
+
+async def main(batch_size: int, user_id: Optional[int], check: bool) -> int:
+    started = time.perf_counter()
+    users = rollup_rows = mismatched = 0
+    last_id = 0
+
+    while True:
+        async with SessionLocal() as db:
+            query = select(User.id).where(User.id > last_id).order_by(User.id).limit(batch_size)
+            if user_id is not None:
+                query = query.where(User.id == user_id)
+            user_ids = list((await db.execute(query)).scalars())
+            if not user_ids:
+                break
+
+            before = await rollup_snapshot(db, user_ids)
+            rollup_rows += await rebuild_for_users(db, user_ids)
+            after = await rollup_snapshot(db, user_ids)
+
+            for uid in user_ids:
+                old, new = before.get(uid, {}), after.get(uid, {})
+                if old != new:
+                    diff = sum(1 for key in old.keys() | new.keys() if old.get(key) != new.get(key))
+                    print(f"  user {uid}: {diff} bucket rollup beda")
+                    mismatched += 1
+
+            if check:
+                await db.rollback()
+            else:
+                await db.commit()
+
+        users += len(user_ids)
+        last_id = user_ids[-1]
+
+    elapsed = time.perf_counter() - started
+    mode = "check" if check else "rebuild"
+    print(f"{mode}: {users} user, {rollup_rows} baris rollup, {mismatched} user beda, {elapsed:.1f} s")
+    return 1 if check and mismatched else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500, help="jumlah user per DB transaction")
+    parser.add_argument("--user-id", type=int, help="rebuild 1 user saja")
+    parser.add_argument("--check", action="store_true", help="bandingkan saja (rollback), exit 1 kalau ada yang beda")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.batch_size, args.user_id, args.check)))
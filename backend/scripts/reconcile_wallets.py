@@ -0,0 +1,103 @@
+"""
+Rekonsiliasi saldo wallet (buat cron malam).
+
+Wallet.balance itu running total yang di-update tiap transaksi. Script ini menghitung ulang
+saldo tiap wallet = opening_balance + INCOME - EXPENSE - TRANSFER keluar + TRANSFER masuk
+(transaksi yang di-soft delete tidak dihitung), lalu melaporkan / memperbaiki yang beda.
+
+- User diproses per batch (keyset pagination by id), agregasi transaksi jalan di DB:
+  memori tergantung --batch-size, bukan jumlah transaksi.
+- Maksimal --concurrency batch jalan bareng (masing-masing 1 koneksi DB).
+- --repair: wallet yang beda di-lock lalu saldonya di-set ulang (1 DB transaction per batch).
+
+Cara pakai (dari folder backend):
+    python -m scripts.reconcile_wallets
+    python -m scripts.reconcile_wallets --repair --batch-size 1000 --concurrency 4
+
+Exit code 1 kalau ada selisih yang tidak diperbaiki.
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+from sqlalchemy.future import select
+
+from app.core.database import SessionLocal
+from app.models.user import User
+from app.services.wallet_reconciliation import BatchResult, check_users, repair_wallets
+
+
+async def produce_batches(queue: asyncio.Queue, batch_size: int, workers: int) -> None:
+    last_id = 0
+    while True:
+        async with SessionLocal() as db:
+            user_ids = list((await db.execute(
+                select(User.id).where(User.id > last_id).order_by(User.id).limit(batch_size)
+            )).scalars())
+        if not user_ids:
+            break
+        await queue.put(user_ids) # Queue terbatas -> producer nunggu kalau worker ketinggalan
+        last_id = user_ids[-1]
+
+    for _ in range(workers):
+        await queue.put(None)
+
+
+async def process_batches(queue: asyncio.Queue, repair: bool, totals: dict) -> None:
+    while (user_ids := await queue.get()) is not None:
+        async with SessionLocal() as db:
+            result: BatchResult = await check_users(db, user_ids)
+            if repair and result.discrepancies:
+                result.repaired = await repair_wallets(db, [d.wallet_id for d in result.discrepancies])
+                await db.commit()
+
+        for d in result.discrepancies:
+            print(f"  wallet {d.wallet_id} (user {d.user_id}): saldo {d.balance} != hitung ulang {d.expected} "
+                  f"(selisih {d.balance - d.expected})")
+
+        totals["users"] += result.users
+        totals["wallets"] += result.wallets
+        totals["transactions"] += result.transactions
+        totals["discrepancies"] += len(result.discrepancies)
+        totals["repaired"] += result.repaired
+
+
+async def report_progress(totals: dict, started: float, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        elapsed = time.perf_counter() - started
+        print(f"... {totals['users']} user, {totals['transactions']} transaksi "
+              f"({totals['transactions'] / elapsed:,.0f} trx/s), {totals['discrepancies']} selisih")
+
+
+async def main(batch_size: int, concurrency: int, repair: bool) -> int:
+    totals = {"users": 0, "wallets": 0, "transactions": 0, "discrepancies": 0, "repaired": 0}
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    started = time.perf_counter()
+
+    progress = asyncio.create_task(report_progress(totals, started, interval=10))
+    try:
+        await asyncio.gather(
+            produce_batches(queue, batch_size, concurrency),
+            *(process_batches(queue, repair, totals) for _ in range(concurrency)),
+        )
+    finally:
+        progress.cancel()
+
+    elapsed = time.perf_counter() - started
+    print(f"\n{totals['users']} user, {totals['wallets']} wallet, {totals['transactions']} transaksi dalam {elapsed:.1f} s")
+    print(f"throughput: {totals['users'] / elapsed:,.0f} user/s, {totals['wallets'] / elapsed:,.0f} wallet/s, "
+          f"{totals['transactions'] / elapsed:,.0f} trx/s")
+    print(f"selisih: {totals['discrepancies']} wallet, diperbaiki: {totals['repaired']}")
+
+    return 1 if totals["discrepancies"] > totals["repaired"] else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500, help="jumlah user per batch")
+    parser.add_argument("--concurrency", type=int, default=4, help="batch yang diproses bareng (= koneksi DB)")
+    parser.add_argument("--repair", action="store_true", help="perbaiki saldo yang beda")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.batch_size, args.concurrency, args.repair)))
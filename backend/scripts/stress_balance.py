@@ -0,0 +1,135 @@
+"""
+Stress test saldo wallet di bawah beban paralel.
+
+Tembak banyak EXPENSE + TRANSFER paralel ke create_transaction di 2 wallet. Transfer jalan
+DUA arah barengan (A->B & B->A), jadi urutan lock row wallet ikut teruji (deadlock = error).
+Lalu buktikan:
+1. Saldo akhir = saldo awal - total transaksi yang SUKSES (tidak ada lost update).
+2. Saldo tidak pernah minus.
+3. Jumlah statement SQL per write (dari engine event).
+
+Cara pakai (dari folder backend, DB sudah di-migrate):
+    python -m scripts.stress_balance --requests 500 --concurrency 50
+
+Exit code 1 kalau saldo gak konsisten atau ada error DB (mis. deadlock). Data stress test dihapus lagi di akhir.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal
+
+from fastapi import HTTPException
+from sqlalchemy import delete, event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.future import select
+
+from app.core.database import engine, SessionLocal
+from app.models.user import User
+from app.models.wallet import Wallet
+from app.models.transaction import Transaction, DailySpending
+from app.routers.transactions import create_transaction
+from app.schemas.transaction import TransactionCreate
+
+AMOUNT = Decimal("1000")
+
+
+async def main(total: int, concurrency: int) -> int:
+    async with SessionLocal() as db:
+        user = User(email=f"stress-{time.time_ns()}@example.invalid", hashed_password="-")
+        db.add(user)
+        await db.flush()
+        # Saldo awal sengaja cuma cukup buat ~setengah debit tiap wallet, biar guard saldo ikut teruji
+        initial = AMOUNT * (total // 4)
+        wallet_a = Wallet(user_id=user.id, name="Stress A", type="CASH", balance=initial)
+        wallet_b = Wallet(user_id=user.id, name="Stress B", type="CASH", balance=initial)
+        db.add_all([wallet_a, wallet_b])
+        await db.commit()
+
+    statements = {"count": 0}
+
+    def count_statement(*args):
+        statements["count"] += 1
+
+    semaphore = asyncio.Semaphore(concurrency)
+    outcome = {"ok": 0, "rejected": 0, "errors": 0}
+    # Perubahan saldo dari request yang SUKSES, per wallet
+    moved = {wallet_a.id: Decimal(0), wallet_b.id: Decimal(0)}
+
+    async def fire(i: int) -> None:
+        # i % 4: 0 = EXPENSE A, 1 = TRANSFER A->B, 2 = EXPENSE B, 3 = TRANSFER B->A
+        is_transfer = i % 2 == 1
+        source, target = (wallet_a, wallet_b) if i % 4 < 2 else (wallet_b, wallet_a)
+        trx_in = TransactionCreate(
+            wallet_id=source.id,
+            amount=AMOUNT,
+            type="TRANSFER" if is_transfer else "EXPENSE",
+            date=datetime.now().astimezone(),
+            target_wallet_id=target.id if is_transfer else None,
+            description=f"stress #{i}",
+        )
+        async with semaphore, SessionLocal() as db:
+            try:
+                await create_transaction(trx_in=trx_in, current_user=user, db=db)
+            except HTTPException as e:
+                if e.status_code != 400:
+                    raise
+                outcome["rejected"] += 1
+                return
+            except DBAPIError as e: # Deadlock / serialization failure -> jadi 500 di API
+                outcome["errors"] += 1
+                print(f"  request #{i} error DB: {e.orig!r}")
+                return
+        outcome["ok"] += 1
+        moved[source.id] -= AMOUNT
+        if is_transfer:
+            moved[target.id] += AMOUNT
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count_statement)
+    started = time.perf_counter()
+    await asyncio.gather(*(fire(i) for i in range(total)))
+    elapsed = time.perf_counter() - started
+    event.remove(engine.sync_engine, "before_cursor_execute", count_statement)
+
+    async with SessionLocal() as db:
+        res = await db.execute(select(Wallet.id, Wallet.balance).where(Wallet.user_id == user.id))
+        balances = dict(res.all())
+        trx_ids = (await db.execute(
+            select(Transaction.id).where(Transaction.user_id == user.id)
+        )).scalars().all()
+
+    expected = {wallet_id: initial + delta for wallet_id, delta in moved.items()}
+    consistent = (
+        outcome["errors"] == 0
+        and balances == expected
+        and all(balance >= 0 for balance in balances.values())
+        and len(trx_ids) == outcome["ok"]
+    )
+
+    print(f"requests        : {total} (concurrency {concurrency})")
+    print(f"succeeded       : {outcome['ok']}  rejected (saldo kurang): {outcome['rejected']}  "
+          f"error DB: {outcome['errors']}")
+    print(f"wallet A balance: {balances[wallet_a.id]} (expected {expected[wallet_a.id]})")
+    print(f"wallet B balance: {balances[wallet_b.id]} (expected {expected[wallet_b.id]})")
+    print(f"throughput      : {total / elapsed:.1f} req/s")
+    print(f"SQL per request : {statements['count'] / total:.2f}")
+    print("RESULT          :", "OK" if consistent else "INCONSISTENT")
+
+    async with SessionLocal() as db:
+        await db.execute(delete(DailySpending).where(DailySpending.user_id == user.id))
+        await db.execute(delete(Transaction).where(Transaction.user_id == user.id))
+        await db.execute(delete(Wallet).where(Wallet.user_id == user.id))
+        await db.execute(delete(User).where(User.id == user.id))
+        await db.commit()
+
+    await engine.dispose()
+    return 0 if consistent else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.requests, args.concurrency)))
@@ -45,11 +45,11 @@ export default function DashboardPage() {
       try {
         const [healthRes, trxRes] = await Promise.all([
           api.get("/api/v1/health"),
-          api.get("/api/v1/transactions"), // Kita ambil semua dulu, nanti di-slice 5
+          api.get("/api/v1/transactions", { params: { limit: 5 } }), // Cukup 5 terbaru
         ]);
         setHealthData(healthRes.data);
         // Ambil 5 transaksi teratas
-        setRecentTrx(trxRes.data.slice(0, 5));
+        setRecentTrx(trxRes.data.items);
       } catch (error) {
         console.error("Error fetching dashboard data:", error);
       } finally {
@@ -42,10 +42,12 @@ interface Category {
 
 export default function TransactionsPage() {
   const [transactions, setTransactions] = useState<Transaction[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null); // null = sudah halaman terakhir
   const [wallets, setWallets] = useState<Wallet[]>([]);
   const [categories, setCategories] = useState<Category[]>([]);
 
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [isModalOpen, setIsModalOpen] = useState(false);
   const [isSubmitting, setIsSubmitting] = useState(false);
 
@@ -73,7 +75,8 @@ export default function TransactionsPage() {
         api.get("/api/v1/transactions/categories"),
       ]);
 
-      setTransactions(trxRes.data);
+      setTransactions(trxRes.data.items);
+      setNextCursor(trxRes.data.next_cursor);
       setWallets(walletRes.data);
       setCategories(catRes.data);
     } catch (error) {
@@ -88,6 +91,24 @@ export default function TransactionsPage() {
     fetchData();
   }, []);
 
+  // Halaman berikutnya (API pakai cursor, 50 transaksi per halaman)
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const res = await api.get("/api/v1/transactions", {
+        params: { cursor: nextCursor },
+      });
+      setTransactions((prev) => [...prev, ...res.data.items]);
+      setNextCursor(res.data.next_cursor);
+    } catch (error) {
+      console.error(error);
+      toast.error("Gagal memuat transaksi sebelumnya.");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   // 2. Submit Transaksi
   const onSubmit = async (data: any) => {
     setIsSubmitting(true);
@@ -253,6 +274,21 @@ export default function TransactionsPage() {
                 ))}
               </tbody>
             </table>
+            {nextCursor && (
+              <div className="p-4 flex justify-center border-t border-slate-50">
+                <button
+                  onClick={loadMore}
+                  disabled={loadingMore}
+                  className="bg-white border border-slate-200 text-slate-600 hover:text-primary hover:border-primary font-bold px-4 py-2.5 rounded-xl flex items-center gap-2 transition-all disabled:opacity-70 disabled:cursor-not-allowed"
+                >
+                  {loadingMore ? (
+                    <Loader2 className="w-5 h-5 animate-spin" />
+                  ) : (
+                    "Muat Lebih Banyak"
+                  )}
+                </button>
+              </div>
+            )}
           </div>
         )}
       </div>